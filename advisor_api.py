@@ -0,0 +1,200 @@
+import collections
+import re
+import sqlite3
+
+import db_api
+import query_api
+import schema_api
+
+Advice = collections.namedtuple('Advice', ('table', 'columns', 'statements', 'elapsed', 'before', 'after'))
+
+SCRATCH_INDEX = f'{schema_api.SHADOW_PREFIX}advice'
+
+MAX_COLUMNS = 3
+
+FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?(\S+)$')
+
+LITERAL = re.compile(r"'(?:[^']|'')*'")
+
+IDENTIFIER = re.compile(r'"((?:[^"]|"")*)"|`([^`]*)`|\[([^\]]*)]|([A-Za-z_]\w*)')
+
+CONDITION = re.compile(r'\b(?:WHERE|ORDER\s+BY)\b', re.IGNORECASE)
+
+
+def get_plan(connection: sqlite3.Connection, sql: str) -> list:
+    """Returns details of EXPLAIN QUERY PLAN of statement"""
+
+    return [record[3] for record in connection.execute(f'EXPLAIN QUERY PLAN {sql}').fetchall()]
+
+
+def get_scanned_tables(connection: sqlite3.Connection, sql: str) -> set:
+    """Returns tables, which are read by statement through full scan without any index"""
+
+    return {match.group(1) for match in map(FULL_SCAN.match, get_plan(connection, sql)) if match}
+
+
+def get_candidate_columns(sql: str, columns: list) -> list:
+    """Returns up to MAX_COLUMNS of columns, which are mentioned by WHERE and ORDER BY clauses of statement,
+    in order of their appearance"""
+
+    sql = LITERAL.sub("''", sql)
+    match = CONDITION.search(sql)
+    if match is None:
+        return []
+    names = {column.lower(): column for column in columns}
+    found = []
+    for identifier in IDENTIFIER.finditer(sql, match.start()):
+        name = next(group for group in identifier.groups() if group is not None).replace('""', '"').lower()
+        if name in names and names[name] not in found:
+            found.append(names[name])
+    return found[:MAX_COLUMNS]
+
+
+def get_candidates(columns: list) -> list:
+    """Returns column tuples of candidate indexes, which are every single column and then all of them"""
+
+    return [(column,) for column in columns] + ([tuple(columns)] if len(columns) > 1 else [])
+
+
+def copy_schema(connection: sqlite3.Connection) -> sqlite3.Connection:
+    """Returns in-memory database with tables, indexes and sqlite_stat1 statistics of connection, but without records,
+    so statements are planned there the same way as in the original database"""
+
+    scratch = sqlite3.connect(':memory:')
+    objects = connection.execute("SELECT type, name, tbl_name, sql FROM sqlite_master WHERE sql NOT NULL "
+                                 "AND type IN ('table', 'index') ORDER BY type DESC").fetchall()
+    internal = schema_api.get_internal_tables([(name, sql) for type_, name, table, sql in objects if type_ == 'table'])
+    for type_, name, table, sql in objects:
+        if table in internal:
+            continue
+        try:
+            scratch.execute(sql)
+        except sqlite3.Error:
+            pass
+    try:
+        stats = connection.execute('SELECT tbl, idx, stat FROM sqlite_stat1').fetchall()
+    except sqlite3.OperationalError:
+        stats = []
+    if stats:
+        scratch.execute('ANALYZE')
+        scratch.executemany('INSERT INTO sqlite_stat1 VALUES (?, ?, ?)', stats)
+        scratch.execute('ANALYZE sqlite_master')
+    return scratch
+
+
+def get_improvement(scratch: sqlite3.Connection, sql: str, table: str, columns: tuple) -> tuple:
+    """Returns details of EXPLAIN QUERY PLAN of statement, which change, if index over columns of table is created
+    in scratch, e.g. ('SCAN t', 'SEARCH t USING INDEX idx_t_a (a=?)'), or None, if table is still scanned
+    or index is not used"""
+
+    before = [detail for detail in get_plan(scratch, sql) if FULL_SCAN.match(detail)]
+    scratch.execute(f'CREATE INDEX {query_api.quote(SCRATCH_INDEX)} ON {query_api.quote(table)} '
+                    f'({", ".join(map(query_api.quote, columns))})')
+    try:
+        after = get_plan(scratch, sql)
+    finally:
+        scratch.execute(f'DROP INDEX {query_api.quote(SCRATCH_INDEX)}')
+    used = [detail for detail in after if SCRATCH_INDEX in detail]
+    if not used or any(match and match.group(1) == table for match in map(FULL_SCAN.match, after)):
+        return None
+    scanned = [detail for detail in before if FULL_SCAN.match(detail).group(1) == table]
+    return scanned[0] if scanned else f'SCAN {table}', used[0].replace(SCRATCH_INDEX, get_index_name(table, columns))
+
+
+def get_index_name(table: str, columns: tuple) -> str:
+    return '_'.join(('idx', table) + columns)
+
+
+def get_index_sql(advice: Advice) -> str:
+    return (f'CREATE INDEX IF NOT EXISTS {query_api.quote(get_index_name(advice.table, advice.columns))} '
+            f'ON {query_api.quote(advice.table)} ({", ".join(map(query_api.quote, advice.columns))})')
+
+
+class AdvisorWorker(query_api.QueryWorker):
+    """Proposes indexes for statements of query_api.LOG, which were executed on database and read tables
+    by full scan
+
+    The smallest candidate index, that turns full scan of table into search or scan by index, is chosen for every
+    statement on the schema copy. chunk(list) signal delivers Advice, which are sorted by logged time of statements,
+    that they would improve, with details of query plan of the first of them before and after the change"""
+
+    def __init__(self, db_path: str):
+        super().__init__(db_path, '')
+
+    def run(self) -> None:
+        connection = db_api.connect(self.db_path)
+        self.connection = connection
+        scratch = None
+        try:
+            with query_api.LOG_LOCK:
+                statements = [entry for (db_path, key), entry in query_api.LOG.items() if db_path == self.db_path]
+            schema = schema_api.Schema(connection)
+            scratch = copy_schema(connection)
+            advice = {}
+            for count, elapsed, sql in statements:
+                if self.is_cancelled:
+                    raise sqlite3.OperationalError('interrupted')
+                try:
+                    tables = get_scanned_tables(scratch, sql) & set(schema.get_tables())
+                except sqlite3.Error:
+                    continue
+                for table in tables:
+                    description = schema.get_table(table)
+                    indexed = [tuple(index[2]) for index in description.indexes]
+                    for columns in get_candidates(
+                            get_candidate_columns(sql, [column[1] for column in description.columns])):
+                        improvement = None if columns in indexed else get_improvement(scratch, sql, table, columns)
+                        if improvement is not None:
+                            advice.setdefault((table, columns), [0, 0.0, *improvement])
+                            advice[table, columns][0] += count
+                            advice[table, columns][1] += elapsed
+                            break
+            advice = sorted((Advice(table, columns, *totals) for (table, columns), totals in advice.items()),
+                            key=lambda i: -i.elapsed)
+            self.signals.chunk.emit(advice)
+            self.signals.finished.emit(len(advice))
+        except sqlite3.Error as e:
+            if self.is_cancelled:
+                self.signals.cancelled.emit()
+            else:
+                self.signals.failed.emit(str(e))
+        finally:
+            if scratch is not None:
+                scratch.close()
+            self.connection = None
+            connection.close()
+            self.signals.done.emit()
+
+
+class IndexWorker(query_api.QueryWorker):
+    """Creates indexes of advice one after another and then updates statistics of their tables by ANALYZE,
+    all through one connection, so statements never wait for write lock of each other
+
+    progress(int) signal reports number of executed statements, finished(int) reports their total"""
+
+    def __init__(self, db_path: str, advice: list):
+        super().__init__(db_path, '')
+        self.advice = list(advice)
+
+    def run(self) -> None:
+        connection = db_api.connect(self.db_path, isolation_level=None)
+        connection.set_progress_handler(self.on_progress, query_api.PROGRESS_STEPS)
+        self.connection = connection
+        statements = [get_index_sql(advice) for advice in self.advice] + \
+            [f'ANALYZE {query_api.quote(table)}' for table in dict.fromkeys(advice.table for advice in self.advice)]
+        try:
+            for i in range(len(statements)):
+                if self.is_cancelled:
+                    raise sqlite3.OperationalError('interrupted')
+                connection.execute(statements[i])
+                self.signals.progress.emit(i + 1)
+            self.signals.finished.emit(len(statements))
+        except sqlite3.Error as e:
+            if self.is_cancelled:
+                self.signals.cancelled.emit()
+            else:
+                self.signals.failed.emit(str(e))
+        finally:
+            self.connection = None
+            connection.close()
+            self.signals.done.emit()
@@ -0,0 +1,10 @@
+"""Headless benchmarks of database manager, which are run from the root of repository by
+
+    python -m benchmark [--scale SCALE] [--output FILE] [--compare FILE]
+
+Synthetic databases are generated in temporary directory, results are written to JSON file. Cold start is measured
+by launching main.py --profile-startup in fresh processes, and
+
+    python -m benchmark --check-startup
+
+measures only it and exits with code 1, if it exceeds startup_budget of config.ini, so it can be run in CI"""
@@ -0,0 +1,67 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.getcwd())
+
+from PyQt5 import QtWidgets  # noqa: E402
+
+import config_api  # noqa: E402
+import loc_api  # noqa: E402
+import query_api  # noqa: E402
+from benchmark import generator, suite  # noqa: E402
+
+
+def get_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='python -m benchmark', description='Headless benchmarks of database manager')
+    parser.add_argument('--scale', type=float, default=1.0, help='multiplier of row counts of datasets')
+    parser.add_argument('--dataset', action='append', choices=list(generator.DATASETS),
+                        help='dataset to run, all by default')
+    parser.add_argument('--output', default='benchmark.json', help='JSON file of results')
+    parser.add_argument('--compare', help='JSON file of previous results, which are compared with new ones')
+    parser.add_argument('--check-startup', action='store_true',
+                        help='only measure cold start and exit with code 1, if it exceeds startup_budget')
+    parser.add_argument('--run-dataset', choices=list(generator.DATASETS), help=argparse.SUPPRESS)
+    parser.add_argument('--directory', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    app = QtWidgets.QApplication(sys.argv)
+    with contextlib.redirect_stdout(io.StringIO()):
+        config_api.load_config()
+        loc_api.load_lang()
+    if args.run_dataset:  # child process of suite.run_process, which prints JSON of one dataset
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = suite.run_dataset(args.directory, args.run_dataset, generator.DATASETS[args.run_dataset],
+                                       args.scale)
+            query_api.shutdown()
+        print(json.dumps(result))
+        sys.exit(0)
+    if args.check_startup:
+        startup = suite.cold_start()
+        print(json.dumps(startup, indent=2))
+        sys.exit(int(startup['over_budget']))
+    with tempfile.TemporaryDirectory() as directory:
+        results = suite.run(directory, args.scale, args.dataset)
+        query_api.shutdown()
+    results['commit'] = get_commit()
+    with open(args.output, 'w') as output:
+        json.dump(results, output, indent=2)
+    print(json.dumps(results, indent=2))
+    if args.compare:
+        with open(args.compare) as previous:
+            for metric, old, new, ratio in suite.compare(json.load(previous), results):
+                print(f'{metric:<48}{old:>14}{new:>14}{ratio:>8.2f}x')
@@ -0,0 +1,52 @@
+import random
+import sqlite3
+import string
+
+import query_api
+
+DATASETS = {
+    'small_mixed': {'rows': 1000, 'types': ('INTEGER', 'REAL', 'TEXT', 'BLOB')},
+    'large_mixed': {'rows': 200000, 'types': ('INTEGER', 'REAL', 'TEXT', 'BLOB')},
+    'null_heavy': {'rows': 100000, 'types': ('INTEGER', 'REAL', 'TEXT', 'BLOB') * 2, 'null_ratio': 0.9},
+    'wide_text': {'rows': 20000, 'types': ('TEXT',) * 30, 'text_size': 200},
+}
+
+BATCH_SIZE = 10000
+
+
+def get_value(sql_type: str, rng: random.Random, text_size: int):
+    """Returns random value of declared column type"""
+
+    if sql_type == 'INTEGER':
+        return rng.randint(-2 ** 31, 2 ** 31)
+    if sql_type == 'REAL':
+        return rng.uniform(-1e6, 1e6)
+    if sql_type == 'TEXT':
+        return ''.join(rng.choices(string.ascii_letters + ' ', k=rng.randint(1, text_size)))
+    return rng.randbytes(rng.randint(1, text_size))
+
+
+def get_records(rows: int, types: tuple, null_ratio: float = 0.0, text_size: int = 16, seed: int = 0):
+    """Yields reproducible random records, where values are NULL with probability null_ratio"""
+
+    rng = random.Random(seed)
+    for _ in range(rows):
+        yield tuple(None if rng.random() < null_ratio else get_value(sql_type, rng, text_size) for sql_type in types)
+
+
+def generate(path: str, rows: int, types: tuple, null_ratio: float = 0.0, text_size: int = 16,
+             table: str = 'bench') -> None:
+    """Creates SQLite database of path with table, which columns c0, c1, ... have declared types"""
+
+    columns = [f'c{i}' for i in range(len(types))]
+    with sqlite3.connect(path) as connection:
+        connection.execute(f'CREATE TABLE {query_api.quote(table)} '
+                           f'({", ".join(f"{column} {sql_type}" for column, sql_type in zip(columns, types))})')
+        insert = f'INSERT INTO {query_api.quote(table)} VALUES ({", ".join("?" * len(types))})'
+        records = get_records(rows, types, null_ratio, text_size)
+        while True:
+            batch = [record for _, record in zip(range(BATCH_SIZE), records)]
+            if not batch:
+                break
+            connection.executemany(insert, batch)
+    connection.close()
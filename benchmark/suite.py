@@ -0,0 +1,220 @@
+import csv
+import json
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from PyQt5 import QtWidgets
+
+try:
+    import resource
+except ImportError:  # not available on Windows, where memory high-water mark is not measured
+    resource = None
+
+import config_api
+import db_api
+import import_api
+import loc_api
+import main
+import query_api
+from benchmark import generator
+
+REPEATS = 5
+
+STARTUP_RUNS = 5
+
+
+def wait(condition, timeout: float = 60) -> None:
+    """Processes events of application until condition is true"""
+
+    end = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > end:
+            raise TimeoutError('benchmark step has not finished in time')
+        QtWidgets.QApplication.processEvents()
+        time.sleep(0.0005)
+
+
+def get_max_rss() -> int:
+    """Returns memory high-water mark of process in KiB"""
+
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // (1024 if sys.platform == 'darwin' else 1)
+
+
+def measure(action, repeats: int = REPEATS) -> float:
+    """Returns median time of action in ms"""
+
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        action()
+        times.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(times), 3)
+
+
+def load_table(path: str) -> None:
+    """Loads the first window of records of bench table through main.load_table"""
+
+    tab = main.DatabaseTable(db_api.open_database(path))
+    main.load_table(tab.database, 'bench', tab)
+    wait(lambda: tab.model().worker is None)
+    tab.deleteLater()
+
+
+def open_tab(path: str) -> None:
+    """Opens DatabaseWindow of database and waits for records of its first tab"""
+
+    window = main.DatabaseWindow(db_api.open_database(path))
+    window.show()
+    wait(lambda: window.table_widget.currentWidget().model().worker is None)
+    window.close()
+    window.deleteLater()
+
+
+def fetch_all(path: str) -> int:
+    """Fetches all records of bench table and returns memory size of model in bytes"""
+
+    tab = main.DatabaseTable(db_api.open_database(path))
+    main.load_table(tab.database, 'bench', tab)
+    model = tab.model()
+    while True:
+        wait(lambda: model.worker is None)
+        if model.exhausted:
+            tab.deleteLater()
+            return model.size
+        model.fetchMore()
+
+
+def import_records(path: str, directory: str, rows: int, types: tuple, **options) -> float:
+    """Returns records per second of ImportWorker, which inserts CSV of generated records into empty table"""
+
+    csv_path = os.path.join(directory, 'import.csv')
+    with open(csv_path, 'w', newline='', encoding='utf8') as file:
+        writer = csv.writer(file)
+        for record in generator.get_records(rows, types, **options):
+            writer.writerow('' if value is None else value.hex() if isinstance(value, bytes) else value
+                            for value in record)
+    table = 'bench_import'
+    columns = [(i, f'c{i}', types[i], 0, None, 0) for i in range(len(types))]
+    done = []
+    query_api.execute(path, f'CREATE TABLE {table} ({", ".join(f"c{i} {types[i]}" for i in range(len(types)))})',
+                      on_finished=done.append)
+    wait(lambda: done)
+    worker = import_api.ImportWorker(path, table, columns, csv_path, header=False)
+    worker.signals.done.connect(lambda: done.append(None))
+    start = time.perf_counter()
+    query_api.start(worker)
+    wait(lambda: len(done) > 1, 600)
+    return round(rows / (time.perf_counter() - start))
+
+
+def insert_single(path: str, count: int = 200) -> float:
+    """Returns statements per second of one-record INSERT executed by query_api like the Add Record dialog does"""
+
+    done = []
+    start = time.perf_counter()
+    for i in range(count):
+        query_api.execute(path, 'INSERT INTO bench (c0) VALUES (?)', (i,), on_finished=done.append)
+        wait(lambda: len(done) > i)
+    return round(count / (time.perf_counter() - start))
+
+
+def get_lang_rate(calls: int = 200000) -> dict:
+    """Returns calls per second of loc_api.get_lang by string key and by QObject scope"""
+
+    scope = QtWidgets.QAction()
+    scope.setObjectName('tbAdd')
+    rates = {}
+    for name, key in (('key', 'dbEditMenu.tbAdd'), ('qobject', scope)):
+        start = time.perf_counter()
+        for _ in range(calls):
+            loc_api.get_lang(key)
+        rates[name] = round(calls / (time.perf_counter() - start))
+    return rates
+
+
+def cold_start(runs: int = STARTUP_RUNS) -> dict:
+    """Launches python main.py --profile-startup in fresh processes and returns median wall-clock time
+    from launch to exit, median total of startup phases reported by app and startup_budget from config.ini
+
+    over_budget is True, if median reported total exceeds the budget"""
+
+    walls = []
+    totals = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        process = subprocess.run([sys.executable, 'main.py', '--profile-startup'], capture_output=True, text=True,
+                                 env=dict(os.environ, QT_QPA_PLATFORM='offscreen'), timeout=120)
+        walls.append((time.perf_counter() - start) * 1000)
+        lines = [line for line in process.stdout.splitlines() if line.startswith('total ')]
+        if process.returncode not in (0, 1) or not lines:
+            raise RuntimeError(f'startup profile has failed: {process.stderr.strip()}')
+        totals.append(float(lines[-1].split()[1]))
+    budget = float(config_api.CONFIG['PERFORMANCE']['startup_budget'])
+    reported = round(statistics.median(totals), 1)
+    return {'wall_ms': round(statistics.median(walls), 1), 'reported_ms': reported, 'budget_ms': budget,
+            'over_budget': reported > budget}
+
+
+def run_dataset(directory: str, name: str, spec: dict, scale: float) -> dict:
+    path = os.path.join(directory, f'{name}.s3db')
+    rows = max(int(spec['rows'] * scale), 1)
+    options = {option: spec[option] for option in ('null_ratio', 'text_size') if option in spec}
+    start = time.perf_counter()
+    generator.generate(path, rows, spec['types'], **options)
+    result = {'rows': rows, 'columns': len(spec['types']),
+              'generate_ms': round((time.perf_counter() - start) * 1000, 3),
+              'file_size': os.path.getsize(path)}
+    result['load_table_ms'] = measure(lambda: load_table(path))
+    result['tab_open_ms'] = measure(lambda: open_tab(path))
+    start = time.perf_counter()
+    result['model_size'] = fetch_all(path)
+    result['fetch_all_ms'] = round((time.perf_counter() - start) * 1000, 3)
+    result['import_records_per_sec'] = import_records(path, directory, rows, spec['types'], **options)
+    result['insert_statements_per_sec'] = insert_single(path)
+    result['max_rss_kib'] = get_max_rss()
+    db_api.close_database(path)
+    return result
+
+
+def run_process(directory: str, name: str, scale: float) -> dict:
+    """Runs benchmarks of dataset by python -m benchmark --run-dataset in fresh process, so its max_rss_kib
+    is memory high-water mark of this dataset only"""
+
+    process = subprocess.run([sys.executable, '-m', 'benchmark', '--run-dataset', name, '--scale', str(scale),
+                              '--directory', directory], capture_output=True, text=True)
+    if process.returncode:
+        raise RuntimeError(f'benchmark of {name} has failed: {process.stderr.strip()}')
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def run(directory: str, scale: float = 1.0, datasets: list = None) -> dict:
+    """Runs benchmarks of datasets from generator.DATASETS, whose row counts are multiplied by scale,
+    each in its own process
+
+    max_rss_kib of results is memory high-water mark of the main process, which does not load datasets"""
+
+    results = {'python': sys.version.split()[0], 'sqlite': sqlite3.sqlite_version, 'scale': scale,
+               'get_lang_per_sec': get_lang_rate(), 'cold_start': cold_start(), 'datasets': {}}
+    for name in datasets or generator.DATASETS:
+        results['datasets'][name] = run_process(directory, name, scale)
+    results['max_rss_kib'] = get_max_rss()
+    return results
+
+
+def compare(old: dict, new: dict, prefix: str = '') -> list:
+    """Returns (metric, old value, new value, ratio) of numeric metrics, which are present in both results"""
+
+    rows = []
+    for name, value in new.items():
+        if name not in old:
+            continue
+        if isinstance(value, dict):
+            rows.extend(compare(old[name], value, f'{prefix}{name}.'))
+        elif isinstance(value, (int, float)) and isinstance(old[name], (int, float)) and old[name]:
+            rows.append((f'{prefix}{name}', old[name], value, value / old[name]))
+    return rows
@@ -0,0 +1,139 @@
+import collections
+import os
+import sqlite3
+
+import db_api
+import query_api
+
+BlobPreview = collections.namedtuple('BlobPreview', ('size', 'head'))
+
+PREVIEW_SIZE = 16
+
+PAGE_SIZE = 4096
+
+CHUNK_SIZE = 1024 * 1024
+
+MAGIC = (
+    (b'\x89PNG\r\n\x1a\n', 'PNG'),
+    (b'\xff\xd8\xff', 'JPEG'),
+    (b'GIF8', 'GIF'),
+    (b'BM', 'BMP'),
+    (b'RIFF', 'RIFF'),
+    (b'%PDF', 'PDF'),
+    (b'PK\x03\x04', 'ZIP'),
+    (b'\x1f\x8b', 'GZIP'),
+    (b'SQLite format 3\x00', 'SQLite'),
+)
+
+UNITS = ('B', 'KB', 'MB', 'GB')
+
+
+def get_preview_projection(column: str) -> str:
+    """Returns projection of quoted column, which selects size and the first PREVIEW_SIZE bytes of BLOB values
+    instead of whole values, so they are never loaded into memory of app. Values of other types are selected as is"""
+
+    return (f"CASE WHEN typeof({column}) = 'blob' THEN length({column}) END, "
+            f"CASE WHEN typeof({column}) = 'blob' THEN substr({column}, 1, {PREVIEW_SIZE}) ELSE {column} END")
+
+
+def get_kind(head: bytes) -> str:
+    """Returns name of file format, which is recognized by magic bytes of head, or None"""
+
+    return next((kind for magic, kind in MAGIC if head.startswith(magic)), None)
+
+
+def get_size_text(size: int) -> str:
+    for unit in UNITS:
+        if size < 1024 or unit == UNITS[-1]:
+            return f'{size} {unit}' if unit == UNITS[0] else f'{size:.1f} {unit}'
+        size /= 1024
+
+
+def get_text(value) -> str:
+    """Returns text of cell value, where BLOB is shown by its format, size and hex of the first bytes"""
+
+    if isinstance(value, bytes):
+        value = BlobPreview(len(value), value[:PREVIEW_SIZE])
+    if isinstance(value, BlobPreview):
+        kind = get_kind(value.head)
+        return f'[{kind + " " if kind else ""}{get_size_text(value.size)}] {value.head[:8].hex(" ").upper()}'
+    return str(value)
+
+
+def get_hex_dump(data: bytes, offset: int = 0) -> str:
+    """Returns lines of 16 bytes of data with their offset, hex and printable ASCII"""
+
+    return '\n'.join(f'{offset + i:08X}  {data[i:i + 16].hex(" ").upper():<47}  '
+                     f'{"".join(chr(byte) if 32 <= byte < 127 else "." for byte in data[i:i + 16])}'
+                     for i in range(0, len(data), 16))
+
+
+def read_page(connection: sqlite3.Connection, table: str, column: str, rowid: int, page: int) -> tuple:
+    """Returns size of BLOB of cell and its page of PAGE_SIZE bytes, which is read by Connection.blobopen
+
+    Cell, which value is not BLOB, has size 0"""
+
+    try:
+        with connection.blobopen(table, column, rowid, readonly=True) as blob:
+            blob.seek(min(page * PAGE_SIZE, len(blob)))
+            return len(blob), blob.read(PAGE_SIZE)
+    except sqlite3.OperationalError:
+        return 0, b''
+
+
+class BlobWorker(query_api.QueryWorker):
+    """Streams BLOB of cell of rowid table to file or file into the cell by chunks of Connection.blobopen,
+    so value is never loaded into memory completely
+
+    progress(int) signal reports number of copied bytes, finished(int) reports their total number. If worker fails
+    or is cancelled, partially written file is removed or change of cell is rolled back"""
+
+    def __init__(self, db_path: str, table: str, column: str, rowid: int, path: str, to_file: bool = True,
+                 chunk_size: int = CHUNK_SIZE):
+        super().__init__(db_path, '', chunk_size=chunk_size)
+        self.table = table
+        self.column = column
+        self.rowid = rowid
+        self.path = path
+        self.to_file = to_file
+
+    def run(self) -> None:
+        connection = db_api.connect(self.db_path)
+        self.connection = connection
+        copied = 0
+        file = None
+        try:
+            if self.to_file:
+                with connection.blobopen(self.table, self.column, self.rowid, readonly=True) as blob, \
+                        open(self.path, 'wb') as file:
+                    while chunk := blob.read(self.chunk_size):
+                        if self.is_cancelled:
+                            raise sqlite3.OperationalError('interrupted')
+                        file.write(chunk)
+                        copied += len(chunk)
+                        self.signals.progress.emit(copied)
+            else:
+                connection.execute(f'UPDATE {query_api.quote(self.table)} SET {query_api.quote(self.column)} = '
+                                   f'zeroblob(?) WHERE _rowid_ = ?', (os.path.getsize(self.path), self.rowid))
+                with connection.blobopen(self.table, self.column, self.rowid, readonly=False) as blob, \
+                        open(self.path, 'rb') as file:
+                    while chunk := file.read(self.chunk_size):
+                        if self.is_cancelled:
+                            raise sqlite3.OperationalError('interrupted')
+                        blob.write(chunk)
+                        copied += len(chunk)
+                        self.signals.progress.emit(copied)
+                connection.commit()
+            self.signals.finished.emit(copied)
+        except (sqlite3.Error, OSError, ValueError) as e:
+            connection.rollback()
+            if self.to_file and file is not None:
+                os.remove(self.path)
+            if self.is_cancelled:
+                self.signals.cancelled.emit()
+            else:
+                self.signals.failed.emit(str(e))
+        finally:
+            self.connection = None
+            connection.close()
+            self.signals.done.emit()
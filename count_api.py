@@ -0,0 +1,88 @@
+import sqlite3
+
+import db_api
+import query_api
+
+COUNTS = {}
+
+
+def get_estimate(connection: sqlite3.Connection, table: str) -> int:
+    """Returns approximate number of records of table from sqlite_stat1 or, if it is not analyzed, None"""
+
+    try:
+        stats = connection.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = ?', (table,)).fetchall()
+    except sqlite3.OperationalError:
+        return None
+    return max((int(stat.split()[0]) for stat, in stats if stat), default=None)
+
+
+def estimate_rows(connection: sqlite3.Connection, table: str) -> int:
+    """Returns instant estimate of number of records of table from sqlite_stat1 or, for rowid tables,
+    which are not analyzed, from span of their rowids, or None
+
+    Minimum and maximum rowids are selected by separate subqueries, so each of them reads one end of B-tree
+    instead of scanning the table. Span counts deleted rowids too, so it can only overestimate. WITHOUT ROWID
+    tables have no _rowid_ column, so their query fails instead of reading schema of every table"""
+
+    estimate = get_estimate(connection, table)
+    if estimate is None:
+        table = query_api.quote(table)
+        try:
+            low, high = connection.execute(f'SELECT (SELECT min(_rowid_) FROM {table}), '
+                                           f'(SELECT max(_rowid_) FROM {table})').fetchone()
+        except sqlite3.OperationalError:
+            return None
+        estimate = 0 if low is None else high - low + 1
+    return estimate
+
+
+def get_count(db_path: str, table: str, state: tuple) -> int:
+    """Returns exact number of records of table, if it was counted in the same state of database, or None"""
+
+    state_, count = COUNTS.get((db_path, table), (None, None))
+    return count if state_ == state else None
+
+
+def set_count(db_path: str, table: str, state: tuple, count: int) -> None:
+    COUNTS[db_path, table] = (state, count)
+
+
+class CountWorker(query_api.QueryWorker):
+    """Counts records of tables by COUNT(*) one by one in background and caches counts for state of database,
+    which is db_api.Database.get_state() with PRAGMA data_version, so they are counted again after any commit
+
+    Instant estimates of tables from estimates are delivered first, then tables are counted, and tables,
+    which counts are cached for the same state, are not counted again. chunk(list) signal delivers
+    (table, number, exact) of every estimate and count, finished(int) reports number of counted tables"""
+
+    def __init__(self, db_path: str, tables: list, state: tuple, estimates: list = ()):
+        super().__init__(db_path, '')
+        self.tables = list(tables)
+        self.state = state
+        self.estimates = list(estimates)
+
+    def run(self) -> None:
+        connection = db_api.connect(self.db_path)
+        connection.set_progress_handler(self.on_progress, query_api.PROGRESS_STEPS)
+        self.connection = connection
+        try:
+            for table in self.estimates:
+                estimate = estimate_rows(connection, table)
+                if estimate is not None:
+                    self.signals.chunk.emit([(table, estimate, False)])
+            for table in self.tables:
+                count = get_count(self.db_path, table, self.state)
+                if count is None:
+                    count = connection.execute(f'SELECT count(*) FROM {query_api.quote(table)}').fetchone()[0]
+                    set_count(self.db_path, table, self.state, count)
+                self.signals.chunk.emit([(table, count, True)])
+            self.signals.finished.emit(len(self.tables))
+        except sqlite3.Error as e:
+            if self.is_cancelled:
+                self.signals.cancelled.emit()
+            else:
+                self.signals.failed.emit(str(e))
+        finally:
+            self.connection = None
+            connection.close()
+            self.signals.done.emit()
@@ -0,0 +1,197 @@
+import contextlib
+import os
+import pathlib
+import sqlite3
+import threading
+
+import config_api
+import schema_api
+
+DATABASES = {
+}
+
+PROFILE_PRAGMAS = ('journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'temp_store')
+
+SNAPSHOT_PROFILE = 'read'
+
+READERS = 4
+
+
+class Database:
+    """Open SQLite database, which connections are configured by PRAGMA profile from config.ini
+
+    The connection, cursor, schema cache and edit session of Database are used by the GUI thread, background workers
+    open their own connections by connect() or take pooled ones by acquire(), so page cache and memory map
+    of profile stay warm between fetches
+
+    Snapshot is a local copy of source database, which connections are read-only by PRAGMA query_only,
+    and which file is removed with its journals and profile cache on close, so workers of snapshot must be done
+    before it is closed"""
+
+    def __init__(self, path: str, profile: str, source: str = None):
+        self.path = path
+        self.profile = profile
+        self.source = source or path
+        self.read_only = source is not None
+        self.connection = self.connect()
+        self.cursor = self.connection.cursor()
+        self.schema = schema_api.Schema(self.connection)
+        self.state = self.get_state()
+        self.readers = []
+        self.lock = threading.Lock()
+        self.closed = False
+        import edit_api
+        self.session = edit_api.EditSession()
+
+    def connect(self, **kwargs) -> sqlite3.Connection:
+        """Returns new connection to database, configured by its profile"""
+
+        connection = sqlite3.connect(self.path, **kwargs)
+        apply_profile(connection, self.profile)
+        if self.read_only:
+            connection.execute('PRAGMA query_only = ON')
+        return connection
+
+    def acquire(self) -> sqlite3.Connection:
+        """Returns idle pooled connection or new one, which can be used by any thread, one at a time"""
+
+        with self.lock:
+            if self.readers:
+                return self.readers.pop()
+        return self.connect(check_same_thread=False)
+
+    def release(self, connection: sqlite3.Connection) -> None:
+        """Returns connection of acquire() to pool, which keeps up to READERS idle connections, or closes it
+
+        Callbacks of connection are removed and its open transaction is rolled back"""
+
+        connection.set_progress_handler(None, 0)
+        connection.set_trace_callback(None)
+        try:
+            if connection.in_transaction:
+                connection.rollback()
+        except sqlite3.Error:
+            connection.close()
+            return
+        with self.lock:
+            if not self.closed and len(self.readers) < READERS:
+                self.readers.append(connection)
+                return
+        connection.close()
+
+    def get_state(self) -> tuple:
+        """Returns PRAGMA data_version of connection, modification time and size of database file and its WAL file,
+        one of which changes on every commit of other connections or processes"""
+
+        state = [self.connection.execute('PRAGMA data_version').fetchone()[0]]
+        for path in (self.path, f'{self.path}-wal'):
+            try:
+                stat = os.stat(path)
+                state.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                state.append(None)
+        return tuple(state)
+
+    def is_changed(self) -> bool:
+        """Returns whether database was modified since the previous call"""
+
+        state = self.get_state()
+        changed = state != self.state
+        self.state = state
+        return changed
+
+    def close(self) -> None:
+        with self.lock:
+            self.closed = True
+            readers, self.readers = self.readers, []
+        for connection in readers:
+            connection.close()
+        self.cursor.close()
+        self.connection.close()
+        if self.read_only:
+            import profile_api
+            for path in (self.path, f'{self.path}-wal', f'{self.path}-shm', f'{self.path}-journal',
+                         profile_api.get_cache_path(self.path)):
+                with contextlib.suppress(OSError):
+                    os.remove(path)
+
+
+def get_profile(profile: str) -> dict:
+    """Returns PRAGMA values of profile, which are set by the [PROFILE___PROFILE__] section of config.ini"""
+
+    return {name: value for name, value in config_api.CONFIG.get(f'PROFILE_{profile.upper()}', {}).items()
+            if name in PROFILE_PRAGMAS}
+
+
+def apply_profile(connection: sqlite3.Connection, profile: str) -> None:
+    """Executes PRAGMA statements of profile on connection
+
+    PRAGMA, that can not be applied (e.g. journal_mode=WAL of read-only database), is skipped"""
+
+    for name, value in get_profile(profile).items():
+        try:
+            connection.execute(f'PRAGMA {name} = {value}').fetchall()
+        except sqlite3.Error:
+            pass
+
+
+def open_database(path: str, profile: str = None, source: str = None) -> Database:
+    """Returns Database of path, opening it with profile, or with profile parameter of config.ini by default,
+    if it is not open yet
+
+    If source is given, path is snapshot of source, which is opened with SNAPSHOT_PROFILE"""
+
+    if path not in DATABASES:
+        DATABASES[path] = Database(path, profile or (SNAPSHOT_PROFILE if source else
+                                                     config_api.CONFIG['DATABASE']['profile']), source)
+    return DATABASES[path]
+
+
+def connect(path: str, **kwargs) -> sqlite3.Connection:
+    """Returns new connection to database of path, configured by profile of its Database, if it is open"""
+
+    if path in DATABASES:
+        return DATABASES[path].connect(**kwargs)
+    connection = sqlite3.connect(path, **kwargs)
+    apply_profile(connection, config_api.CONFIG['DATABASE']['profile'])
+    return connection
+
+
+def connect_read_only(path: str, **kwargs) -> sqlite3.Connection:
+    """Returns new connection, which opens existing database file of path read-only and applies no profile,
+    so neither its file nor its persistent PRAGMA (journal_mode) are changed"""
+
+    return sqlite3.connect(f'{pathlib.Path(path).resolve().as_uri()}?mode=ro', uri=True, **kwargs)
+
+
+def acquire(path: str) -> sqlite3.Connection:
+    """Returns pooled connection of Database of path, if it is open, or new connection, which is given back
+    by release()"""
+
+    if path in DATABASES:
+        return DATABASES[path].acquire()
+    return connect(path, check_same_thread=False)
+
+
+def release(path: str, connection: sqlite3.Connection) -> None:
+    database = DATABASES.get(path)
+    if database is not None:
+        database.release(connection)
+    else:
+        connection.close()
+
+
+def get_profiles() -> list:
+    """Returns names of PRAGMA profiles, which are sections [PROFILE___NAME__] of config.ini"""
+
+    return [section[len('PROFILE_'):].lower() for section in config_api.CONFIG if section.startswith('PROFILE_')]
+
+
+def close_database(path: str) -> None:
+    if path in DATABASES:
+        DATABASES.pop(path).close()
+
+
+def close_all() -> None:
+    for path in list(DATABASES):
+        close_database(path)
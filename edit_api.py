@@ -0,0 +1,232 @@
+import collections
+import sqlite3
+import time
+from PyQt5 import QtCore
+
+import db_api
+import query_api
+
+Step = collections.namedtuple('Step', ('kind', 'table', 'key', 'keys', 'values'))
+
+MAX_PARAMETERS = 999
+
+MIN_SPAN = 3
+
+TEXT_SIZE = 200
+
+
+def get_spans(keys: list) -> list:
+    """Returns (first, last) spans of contiguous integer rowids of keys"""
+
+    spans = []
+    for rowid in sorted({key[0] for key in keys}):
+        if spans and spans[-1][1] == rowid - 1:
+            spans[-1][1] = rowid
+        else:
+            spans.append([rowid, rowid])
+    return spans
+
+
+def get_key_conditions(key: tuple, keys: list, reserved: int = 0) -> list:
+    """Returns WHERE conditions, which select records with keys by quoted key columns, and their parameters
+
+    Rowids are selected by BETWEEN for spans of at least MIN_SPAN contiguous ones and by IN for the rest,
+    other keys are selected by IN with row values. Every condition has up to MAX_PARAMETERS parameters
+    less reserved ones, which statement binds before condition (e.g. values of UPDATE), so selection of any size
+    is handled by a few set-based statements"""
+
+    limit = max(MAX_PARAMETERS - reserved, len(key), 2)
+    terms = []
+    if key == ('_rowid_',) and all(isinstance(record_key[0], int) for record_key in keys):
+        rest = []
+        for first, last in get_spans(keys):
+            if last - first + 1 >= MIN_SPAN:
+                terms.append(('_rowid_ BETWEEN ? AND ?', (first, last)))
+            else:
+                rest.extend(range(first, last + 1))
+        for i in range(0, len(rest), limit):
+            batch = tuple(rest[i:i + limit])
+            terms.append((f'_rowid_ IN ({", ".join("?" * len(batch))})', batch))
+    else:
+        placeholders = f'({", ".join("?" * len(key))})'
+        size = limit // len(key)
+        for i in range(0, len(keys), size):
+            batch = keys[i:i + size]
+            terms.append((f'({", ".join(key)}) IN (VALUES {", ".join([placeholders] * len(batch))})',
+                          tuple(value for record_key in batch for value in record_key)))
+    conditions = []
+    for condition, params in terms:
+        if conditions and len(conditions[-1][1]) + len(params) <= limit:
+            conditions[-1] = (f'{conditions[-1][0]} OR {condition}', conditions[-1][1] + params)
+        else:
+            conditions.append((condition, params))
+    return conditions
+
+
+def get_statements(step: Step) -> list:
+    """Returns parameterized SQL commands of step with their parameters"""
+
+    table = query_api.quote(step.table)
+    if step.kind == 'insert':
+        return [(f'INSERT INTO {table} ({", ".join(map(query_api.quote, step.values))}) '
+                 f'VALUES ({", ".join("?" * len(step.values))})', tuple(step.values.values()))]
+    if step.kind == 'update':
+        assignments = ', '.join(f'{query_api.quote(column)} = ?' for column in step.values)
+        return [(f'UPDATE {table} SET {assignments} WHERE {condition}', (*step.values.values(), *params))
+                for condition, params in get_key_conditions(step.key, step.keys, len(step.values))]
+    return [(f'DELETE FROM {table} WHERE {condition}', params)
+            for condition, params in get_key_conditions(step.key, step.keys)]
+
+
+def get_text(step: Step) -> str:
+    """Returns the first SQL command of step, where parameters are replaced with literals, to show it to user
+
+    Text is cut to TEXT_SIZE characters and followed by number of other commands of step"""
+
+    import export_api
+    statements = get_statements(step)
+    sql, params = statements[0]
+    parts = sql.split('?')
+    text = ''.join(part + export_api.to_literal(param) for part, param in zip(parts, params)) + parts[-1]
+    if len(text) > TEXT_SIZE:
+        text = f'{text[:TEXT_SIZE]}...'
+    return f'{text} (+{len(statements) - 1})' if len(statements) > 1 else text
+
+
+class EditSession(QtCore.QObject):
+    """Inserts, updates and deletes of database, which are staged in memory, until they are committed
+    by CommitWorker in one transaction
+
+    Updates and deletes of several records are single steps, which are executed by set-based statements.
+    Steps are undone one by one from the last one. changed() signal is emitted on every change of steps,
+    so views can repaint staged values"""
+
+    changed = QtCore.pyqtSignal()
+
+    def __init__(self, parent: QtCore.QObject = None):
+        super().__init__(parent)
+        self.steps = []
+        self.cells = {}
+        self.deleted = set()
+
+    def add(self, step: Step) -> None:
+        self.steps.append(step)
+        self.index()
+        self.changed.emit()
+
+    def insert(self, table: str, values: dict) -> None:
+        self.add(Step('insert', table, None, None, values))
+
+    def update(self, table: str, key: tuple, keys: list, values: dict) -> None:
+        self.add(Step('update', table, key, list(keys), values))
+
+    def delete(self, table: str, key: tuple, keys: list) -> None:
+        self.add(Step('delete', table, key, list(keys), {}))
+
+    def undo(self) -> Step:
+        """Removes the last step and returns it"""
+
+        step = self.steps.pop()
+        self.index()
+        self.changed.emit()
+        return step
+
+    def clear(self) -> None:
+        self.steps = []
+        self.index()
+        self.changed.emit()
+
+    def remove(self, steps: list) -> None:
+        """Removes steps, e.g. committed ones, keeping steps, which were staged after them"""
+
+        removed = set(map(id, steps))
+        self.steps = [step for step in self.steps if id(step) not in removed]
+        self.index()
+        self.changed.emit()
+
+    def index(self) -> None:
+        """Collects staged values of cells and deleted records of steps, which are looked up by models on painting"""
+
+        self.cells = {}
+        self.deleted = set()
+        for step in self.steps:
+            for record_key in step.keys or ():
+                if step.kind == 'update':
+                    for column, value in step.values.items():
+                        self.cells[step.table, record_key, column] = value
+                elif step.kind == 'delete':
+                    self.deleted.add((step.table, record_key))
+
+    def get_value(self, table: str, key: tuple, column: str, default=None):
+        """Returns staged value of cell or default, if it is not changed"""
+
+        return self.cells.get((table, key, column), default)
+
+    def is_changed(self, table: str, key: tuple, column: str) -> bool:
+        return (table, key, column) in self.cells
+
+    def is_deleted(self, table: str, key: tuple) -> bool:
+        return (table, key) in self.deleted
+
+
+class CommitWorker(query_api.QueryWorker):
+    """Executes steps of EditSession in one transaction, where every step is wrapped into its own SAVEPOINT
+
+    By default commit is all-or-nothing: if step fails, the whole transaction is rolled back, so database is left
+    intact and failed_step keeps index of the step. If skip_failed is True, changes of failed step are undone
+    by ROLLBACK TO its savepoint, its index is added to skipped, and the other steps are committed.
+    finished(int) reports number of executed statements, elapsed keeps duration of commit in ms"""
+
+    def __init__(self, db_path: str, edits: list, skip_failed: bool = False):
+        super().__init__(db_path, '')
+        self.edits = list(edits)
+        self.skip_failed = skip_failed
+        self.elapsed = 0.0
+        self.failed_step = None
+        self.skipped = []
+
+    def get_committed(self) -> list:
+        """Returns steps, which were committed"""
+
+        return [self.edits[i] for i in range(len(self.edits)) if i not in self.skipped]
+
+    def run(self) -> None:
+        connection = db_api.connect(self.db_path, isolation_level=None)
+        self.connection = connection
+        start = time.perf_counter()
+        statements = 0
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            for step in range(len(self.edits)):
+                if self.is_cancelled:
+                    raise sqlite3.OperationalError('interrupted')
+                connection.execute(f'SAVEPOINT step_{step}')
+                executed = 0
+                try:
+                    for statement in get_statements(self.edits[step]):
+                        connection.execute(*statement)
+                        executed += 1
+                except sqlite3.Error:
+                    if not self.skip_failed or self.is_cancelled:
+                        self.failed_step = step
+                        raise
+                    connection.execute(f'ROLLBACK TO step_{step}')
+                    self.skipped.append(step)
+                    executed = 0
+                connection.execute(f'RELEASE step_{step}')
+                statements += executed
+                self.signals.progress.emit(step + 1)
+            connection.execute('COMMIT')
+            self.elapsed = (time.perf_counter() - start) * 1000
+            self.signals.finished.emit(statements)
+        except sqlite3.Error as e:
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            if self.is_cancelled:
+                self.signals.cancelled.emit()
+            else:
+                self.signals.failed.emit(str(e))
+        finally:
+            self.connection = None
+            connection.close()
+            self.signals.done.emit()
@@ -0,0 +1,119 @@
+import csv
+import gzip
+import json
+import math
+import os
+import sqlite3
+
+import config_api
+import db_api
+import query_api
+
+FORMATS = {
+    '.csv': 'csv',
+    '.tsv': 'tsv',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+    '.sql': 'sql',
+}
+
+
+def get_format(path: str) -> str:
+    """Returns export format by file extension, which may be followed by .gz"""
+
+    if path.lower().endswith('.gz'):
+        path = path[:-3]
+    return FORMATS.get(os.path.splitext(path)[1].lower(), 'csv')
+
+
+def open_file(path: str):
+    """Opens file for text writing, compressed by gzip, if its name ends with .gz"""
+
+    if path.lower().endswith('.gz'):
+        return gzip.open(path, 'wt', compresslevel=6, encoding='utf8', newline='')
+    return open(path, 'w', encoding='utf8', newline='')
+
+
+def to_text(value):
+    """Returns value, which can be written to CSV or JSON, where BLOB is represented by hex string"""
+
+    return value.hex() if isinstance(value, bytes) else value
+
+
+def to_literal(value) -> str:
+    """Returns SQL literal of value, where infinities are written as out-of-range reals 9e999 and -9e999,
+    which SQLite reads back as them, and NaN, which SQLite stores as NULL, as NULL"""
+
+    if value is None or value != value:
+        return 'NULL'
+    if isinstance(value, float) and value in (math.inf, -math.inf):
+        return '9e999' if value > 0 else '-9e999'
+    if isinstance(value, bytes):
+        return f"X'{value.hex()}'"
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return repr(value)
+
+
+class ExportWorker(query_api.QueryWorker):
+    """Writes result of SQL query to CSV, TSV, JSON-lines or SQL INSERT dump by chunks of fetchmany
+
+    progress(int) signal reports number of written records after every chunk, finished(int) reports their total
+    number. If worker fails or is cancelled, partially written file is removed"""
+
+    def __init__(self, db_path: str, sql: str, path: str, table: str = 'query_result', params=(),
+                 chunk_size: int = None):
+        super().__init__(db_path, sql, params,
+                         chunk_size=chunk_size or int(config_api.CONFIG['DATABASE']['export_chunk_size']))
+        self.path = path
+        self.table = table
+
+    def run(self) -> None:
+        connection = db_api.connect(self.db_path)
+        self.connection = connection
+        file = None
+        try:
+            cursor = connection.execute(self.sql, self.params)
+            if cursor.description is None:
+                raise sqlite3.ProgrammingError('statement returns no records')
+            names = [column[0] for column in cursor.description]
+            format_ = get_format(self.path)
+            file = open_file(self.path)
+            if format_ in ('csv', 'tsv'):
+                writer = csv.writer(file, delimiter=',' if format_ == 'csv' else '\t')
+                writer.writerow(names)
+            elif format_ == 'sql':
+                file.write('BEGIN TRANSACTION;\n')
+            insert = f'INSERT INTO {query_api.quote(self.table)} ({", ".join(map(query_api.quote, names))}) VALUES'
+            rows = 0
+            while not self.is_cancelled:
+                chunk = cursor.fetchmany(self.chunk_size)
+                if not chunk:
+                    break
+                if format_ in ('csv', 'tsv'):
+                    writer.writerows([to_text(value) for value in record] for record in chunk)
+                elif format_ == 'jsonl':
+                    file.writelines(json.dumps(dict(zip(names, map(to_text, record))), ensure_ascii=False) + '\n'
+                                    for record in chunk)
+                else:
+                    file.writelines(f'{insert} ({", ".join(map(to_literal, record))});\n' for record in chunk)
+                rows += len(chunk)
+                self.signals.progress.emit(rows)
+            if self.is_cancelled:
+                raise sqlite3.OperationalError('interrupted')
+            if format_ == 'sql':
+                file.write('COMMIT;\n')
+            file.close()
+            self.signals.finished.emit(rows)
+        except (sqlite3.Error, OSError) as e:
+            if file is not None:
+                file.close()
+                os.remove(self.path)
+            if self.is_cancelled:
+                self.signals.cancelled.emit()
+            else:
+                self.signals.failed.emit(str(e))
+        finally:
+            self.connection = None
+            connection.close()
+            self.signals.done.emit()
@@ -0,0 +1,148 @@
+import csv
+import itertools
+import json
+import os
+import sqlite3
+
+import config_api
+import db_api
+import query_api
+import style_api
+
+FORMATS = {
+    '.csv': 'csv',
+    '.tsv': 'tsv',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+}
+
+FIELD_SIZE_LIMIT = 2 ** 31 - 1
+
+
+def read_delimited(path: str, delimiter: str):
+    """Yields records of CSV or TSV file as lists of strings, including header
+
+    Fields are limited by FIELD_SIZE_LIMIT instead of 128 KB of csv module, so large text values are imported too"""
+
+    csv.field_size_limit(FIELD_SIZE_LIMIT)
+    with open(path, 'r', encoding='utf8', newline='') as file:
+        yield from csv.reader(file, delimiter=delimiter)
+
+
+def read_json_lines(path: str):
+    """Yields records of JSON-lines file as dicts, skipping empty lines
+
+    Line, which is not JSON object, raises ValueError"""
+
+    with open(path, 'r', encoding='utf8') as file:
+        for number, line in enumerate(file, 1):
+            if line.strip():
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError(f'line {number} is not JSON object')
+                yield record
+
+
+def read_records(path: str, columns: list, header: bool = True) -> tuple:
+    """Returns names of mapped columns and generator of records, which values are ordered like these columns
+
+        path: str - path to .csv, .tsv, .jsonl or .ndjson file
+        columns: list - result of PRAGMA table_info for target table,
+        header: bool - whether the first record of CSV/TSV file is header
+    Columns are mapped by names from CSV/TSV header or JSON keys case-insensitively. Fields of headerless file
+    are mapped to columns by position. Header, which matches no column, raises ValueError"""
+
+    format_ = FORMATS.get(os.path.splitext(path)[1].lower(), 'csv')
+    names = {column[1].lower(): column for column in columns}
+    if format_ == 'jsonl':
+        records = read_json_lines(path)
+        first = next(records, None)
+        if first is None:
+            return [], iter(())
+        keys = [key for key in first if key.lower() in names]
+        mapped = [names[key.lower()] for key in keys]
+        records = (tuple(record.get(key) for key in keys) for record in itertools.chain((first,), records))
+        return [column[1] for column in mapped], convert_records(records, mapped)
+    records = read_delimited(path, ',' if format_ == 'csv' else '\t')
+    first = next(records, None)
+    if first is None:
+        return [], iter(())
+    if header:
+        positions = [i for i in range(len(first)) if first[i].strip().lower() in names]
+        if not positions:
+            raise ValueError('header of file matches no column of the table')
+        mapped = [names[first[i].strip().lower()] for i in positions]
+    else:
+        positions = list(range(min(len(first), len(columns))))
+        mapped = list(columns[:len(positions)])
+        records = itertools.chain((first,), records)
+    records = (tuple(record[i] if i < len(record) else None for i in positions) for record in records)
+    return [column[1] for column in mapped], convert_records(records, mapped)
+
+
+def convert_records(records, columns: list):
+    """Yields records, where empty strings of non-text columns are replaced with NULL
+
+    Numeric strings are left to SQLite type affinity of the column"""
+
+    nullable = [i for i in range(len(columns)) if style_api.get_affinity(columns[i][2]) != 'text']
+    if not nullable:
+        yield from records
+        return
+    for record in records:
+        if any(record[i] == '' for i in nullable):
+            record = list(record)
+            for i in nullable:
+                if record[i] == '':
+                    record[i] = None
+        yield record
+
+
+class ImportWorker(query_api.QueryWorker):
+    """Streams records from file into SQLite table by batches of executemany inside one transaction
+
+    progress(int) signal reports number of inserted records after every batch, finished(int) reports their total
+    number after commit. If worker fails or is cancelled, the transaction is rolled back"""
+
+    def __init__(self, db_path: str, table: str, columns: list, path: str, header: bool = True,
+                 batch_size: int = None):
+        super().__init__(db_path, '')
+        self.table = table
+        self.columns = columns
+        self.path = path
+        self.header = header
+        self.batch_size = batch_size or int(config_api.CONFIG['DATABASE']['import_batch_size'])
+
+    def run(self) -> None:
+        connection = db_api.connect(self.db_path, isolation_level=None)
+        self.connection = connection
+        try:
+            names, records = read_records(self.path, self.columns, self.header)
+            if not names:
+                raise sqlite3.DataError('no columns of file match the table')
+            sql = f'INSERT INTO {query_api.quote(self.table)} ({", ".join(map(query_api.quote, names))}) ' \
+                  f'VALUES ({", ".join("?" * len(names))})'
+            connection.execute('BEGIN')
+            rows = 0
+            while not self.is_cancelled:
+                batch = list(itertools.islice(records, self.batch_size))
+                if not batch:
+                    break
+                connection.executemany(sql, batch)
+                rows += len(batch)
+                self.signals.progress.emit(rows)
+            if self.is_cancelled:
+                raise sqlite3.OperationalError('interrupted')
+            connection.execute('COMMIT')
+            self.signals.finished.emit(rows)
+        except (sqlite3.Error, OSError, ValueError, csv.Error) as e:
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            if self.is_cancelled:
+                self.signals.cancelled.emit()
+            else:
+                self.signals.failed.emit(str(e))
+        finally:
+            self.connection = None
+            connection.close()
+            self.signals.done.emit()
@@ -0,0 +1,126 @@
+import collections
+import marshal
+import os
+import sqlite3
+
+import db_api
+import query_api
+import schema_api
+
+DatabaseInfo = collections.namedtuple('DatabaseInfo', ('path', 'size', 'mtime', 'pages', 'tables', 'rows'))
+
+EXTENSIONS = ('.s3db', '.db')
+
+HEADER = b'SQLite format 3\x00'
+
+CACHE_PATH = 'res/cache/launcher.marshal'
+
+
+def read_header(path: str) -> tuple:
+    """Returns page size and page count of database from the first 100 bytes of its file, or None for files,
+    which are not SQLite databases
+
+    Page count of header is used only if it is valid for the current change counter, otherwise it is calculated
+    from file size"""
+
+    with open(path, 'rb') as file:
+        header = file.read(100)
+    if len(header) < 100 or not header.startswith(HEADER):
+        return None
+    page_size = int.from_bytes(header[16:18], 'big')
+    page_size = 65536 if page_size == 1 else page_size
+    pages = int.from_bytes(header[28:32], 'big')
+    if not pages or header[24:28] != header[92:96]:
+        pages = os.path.getsize(path) // page_size
+    return page_size, pages
+
+
+def read_catalog(path: str) -> tuple:
+    """Returns number of user tables of database and sum of their rows from sqlite_stat1, which is None,
+    if none of tables is analyzed
+
+    Database is opened read-only, and only its schema and statistics are read"""
+
+    connection = db_api.connect_read_only(path)
+    try:
+        tables = connection.execute("SELECT name, sql FROM sqlite_master WHERE type = 'table'").fetchall()
+        internal = schema_api.get_internal_tables(tables)
+        tables = [name for name, sql in tables if name not in internal]
+        try:
+            stats = connection.execute('SELECT tbl, stat FROM sqlite_stat1').fetchall()
+        except sqlite3.OperationalError:
+            stats = []
+        rows = {}
+        for table, stat in stats:
+            if table in tables and stat:
+                rows[table] = max(rows.get(table, 0), int(stat.split()[0]))
+        return len(tables), sum(rows.values()) if rows else None
+    finally:
+        connection.close()
+
+
+def read_cache() -> dict:
+    try:
+        with open(CACHE_PATH, 'rb') as cache:
+            return {path: DatabaseInfo(*info) for path, info in marshal.load(cache).items()}
+    except (OSError, EOFError, ValueError, TypeError):
+        return {}
+
+
+def write_cache(infos: dict) -> None:
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        with open(f'{CACHE_PATH}.tmp', 'wb') as cache:
+            marshal.dump({path: tuple(info) for path, info in infos.items()}, cache)
+        os.replace(f'{CACHE_PATH}.tmp', CACHE_PATH)
+    except OSError:
+        pass
+
+
+class ScanWorker(query_api.QueryWorker):
+    """Collects DatabaseInfo of database files of directory in background
+
+    Info of file is read from cache in CACHE_PATH, while its modification time and size are the same, so only new
+    and modified files are scanned by reading their header, schema and sqlite_stat1. chunk(list) signal delivers
+    cached infos at once and then every scanned one, finished(int) reports number of databases"""
+
+    def __init__(self, directory: str):
+        super().__init__(directory, '')
+
+    def run(self) -> None:
+        try:
+            cache = read_cache()
+            infos = {}
+            stale = []
+            for entry in sorted(os.scandir(self.db_path), key=lambda i: i.name.lower()):
+                if not entry.is_file() or not entry.name.lower().endswith(EXTENSIONS):
+                    continue
+                stat = entry.stat()
+                info = cache.get(entry.path)
+                if info is not None and (info.mtime, info.size) == (stat.st_mtime_ns, stat.st_size):
+                    infos[entry.path] = info
+                else:
+                    stale.append((entry.path, stat))
+            self.signals.chunk.emit(list(infos.values()))
+            for path, stat in stale:
+                if self.is_cancelled:
+                    raise sqlite3.OperationalError('interrupted')
+                try:
+                    header = read_header(path)
+                    if header is None:
+                        continue
+                    tables, rows = read_catalog(path)
+                except (sqlite3.Error, OSError):
+                    continue
+                infos[path] = DatabaseInfo(path, stat.st_size, stat.st_mtime_ns, header[1], tables, rows)
+                self.signals.chunk.emit([infos[path]])
+            if stale:
+                write_cache(infos)
+            self.signals.finished.emit(len(infos))
+        except (sqlite3.Error, OSError) as e:
+            if self.is_cancelled:
+                self.signals.cancelled.emit()
+            else:
+                self.signals.failed.emit(str(e))
+        finally:
+            self.signals.done.emit()
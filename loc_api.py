@@ -1,5 +1,5 @@
+import marshal
 import os
-import yaml
 from PyQt5 import QtCore
 
 import config_api
@@ -7,50 +7,112 @@ import config_api
 LANG = {
 }
 
+TABLE = {
+}
+
+KEYS = set()
+
+CACHE_DIR = 'res/cache/lang'
+
 
 def load_lang() -> None:
-    """Loads localization keys from res/lang to LANG dict"""
+    """Loads localization keys of the selected language and English ones, which are used for fallback, to LANG dict
 
-    global LANG
-    for file in os.listdir('res/lang'):
-        with open(f'res/lang/{file}', 'r', encoding='utf8') as yml:
-            LANG[file[:-4]] = yaml.load(yml, Loader=yaml.CLoader)
+    Other languages of res/lang are loaded only when they are selected"""
+
+    select_lang(config_api.CONFIG['APPEARANCE']['lang'])
     log()
 
 
+def get_lang_keys(lang: str) -> dict:
+    """Returns localization keys of lang, loading them on first request"""
+
+    if lang not in LANG:
+        LANG[lang] = read_lang(lang)
+        KEYS.update(LANG[lang])
+    return LANG[lang]
+
+
+def read_lang(lang: str) -> dict:
+    """Reads res/lang/__lang__.yml through its compiled cache in CACHE_DIR, which is rebuilt if the file was modified
+    since the cache was written"""
+
+    try:
+        mtime = os.stat(f'res/lang/{lang}.yml').st_mtime_ns
+    except OSError:
+        return {}
+    keys = read_cache(lang, mtime)
+    if keys is None:
+        import yaml  # only needed to rebuild stale cache, so it is not imported at startup
+        with open(f'res/lang/{lang}.yml', 'r', encoding='utf8') as yml:
+            keys = yaml.load(yml, Loader=yaml.CLoader)
+        write_cache(lang, mtime, keys)
+    return keys
+
+
+def read_cache(lang: str, mtime: int):
+    """Returns localization keys from compiled cache, if it was written for file with the same modification time"""
+
+    try:
+        with open(f'{CACHE_DIR}/{lang}.marshal', 'rb') as cache:
+            cached_mtime, keys = marshal.load(cache)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    return keys if cached_mtime == mtime else None
+
+
+def write_cache(lang: str, mtime: int, keys: dict) -> None:
+    """Writes localization keys with modification time of their file to compiled cache"""
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(f'{CACHE_DIR}/{lang}.marshal.tmp', 'wb') as cache:
+            marshal.dump((mtime, keys), cache)
+        os.replace(f'{CACHE_DIR}/{lang}.marshal.tmp', f'{CACHE_DIR}/{lang}.marshal')
+    except OSError:
+        pass
+
+
+def select_lang(lang: str) -> None:
+    """Flattens localization keys of lang and English ones, which are used for fallback, to TABLE"""
+
+    global TABLE
+    TABLE = {**get_lang_keys('english'), **get_lang_keys(lang)}
+
+
+def set_lang(lang: str) -> None:
+    """Changes the lang parameter of configuration and resolves localization keys for the new language"""
+
+    config_api.CONFIG['APPEARANCE']['lang'] = lang
+    select_lang(lang)
+
+
 def get_lang(scope) -> str:
     """get_lang(scope) -> str, where scope is QObject or str
 
     Returns text by the localization key from res/lang/__language__.yml, where __language__ is the selected language
     corresponding to the lang parameter from the config.ini file. If there is no such value, then __language__
-    equates to the language corresponding to the default_lang parameter from the config.ini configuration file. If
-    there is no such value either, it returns the localization key"""
+    equates to English. If there is no such value either, it returns the localization key"""
 
     if isinstance(scope, QtCore.QObject):
         key = get_loc_key(scope)
     else:
         key = scope
-
-    if key in LANG[config_api.CONFIG['APPEARANCE']['lang']]:
-        return LANG[config_api.CONFIG['APPEARANCE']['lang']][key]
-    elif key in LANG['english']:
-        return LANG['english'][key]
-    return key
+    return TABLE.get(key, key)
 
 
 def get_loc_key(scope: QtCore.QObject) -> str:
     """Returns dot-separated path from first parent QObject to scope"""
 
-    if scope.parent():
-        return get_loc_key(scope.parent()) + '.' + scope.objectName()
-    else:
-        return scope.objectName()
+    names = []
+    while scope is not None:
+        names.append(scope.objectName())
+        scope = scope.parent()
+    return '.'.join(reversed(names))
 
 
 def is_valid_key(key: str) -> bool:
-    if any(key in lang for lang in LANG):
-        return True
-    return False
+    return key in KEYS
 
 
 def log():
@@ -1,45 +1,101 @@
-import io
-import sqlite3
-import sys
-import loc_api
-import config_api
-from PyQt5 import QtGui, QtWidgets
-
-DB: sqlite3.Connection
-CURSOR: sqlite3.Cursor
-
-SYSTEM_TABLES = ('sqlite_master', 'sqlite_sequence',
-                 'sqlite_stat1', 'sqlite_stat2', 'sqlite_stat3', 'sqlite_stat4')
+import time
+
+STARTED = time.perf_counter()  # before other imports, so their time is measured by --profile-startup too
+
+import collections  # noqa: E402
+import contextlib  # noqa: E402
+import io  # noqa: E402
+import os  # noqa: E402
+import sys  # noqa: E402
+import tempfile  # noqa: E402
+import loc_api  # noqa: E402
+import config_api  # noqa: E402
+import db_api  # noqa: E402
+import metrics_api  # noqa: E402
+import query_api  # noqa: E402
+import style_api  # noqa: E402
+from PyQt5 import QtCore, QtGui, QtWidgets  # noqa: E402
+
+STARTUP = []
 
 PROVIDED_TYPES = ('INTEGER', 'REAL', 'TEXT', 'BLOB')
 
+TYPE_ROLE = QtCore.Qt.UserRole
 
-def load_table(table: str, scope: QtWidgets.QTableWidget) -> None:
-    """Loads all records from SQLite table to QTableWidget
 
+@metrics_api.timed('load_table')
+def load_table(database: db_api.Database, table: str, scope: QtWidgets.QTableView) -> None:
+    """Binds SQLite table to QTableView through DatabaseTableModel and fetches its first window of records
+
+        database: Database - database of table
         table: str - SQLite table name
-        scope: QTableWidget - table into which the values will be loaded,
+        scope: QTableView - table into which the values will be loaded,
     """
 
-    columns = CURSOR.execute(
-        f"PRAGMA table_info({table})").fetchall()
-    print(columns)
-    scope.setColumnCount(len(columns))
-    scope.setHorizontalHeaderLabels([i[1] for i in columns])
-    records = CURSOR.execute(f"SELECT * FROM {table}").fetchall()
-    scope.setRowCount(len(records))
-    for i in range(len(records)):
-        for j in range(len(columns)):
-            cell = DatabaseLabel(columns[j][2])
-            cell.setText(str(records[i][j]))
-            scope.setCellWidget(i, j, cell)
+    model = DatabaseTableModel(database, table, scope)
+    scope.setModel(model)
+    model.fetchMore(QtCore.QModelIndex())
+
+
+@contextlib.contextmanager
+def startup_phase(name: str):
+    """Measures wall-clock time of startup phase and appends it to STARTUP"""
+
+    start = time.perf_counter()
+    yield
+    STARTUP.append((name, time.perf_counter() - start))
+
+
+def get_process_age() -> float:
+    """Returns seconds since start of process, which are read from /proc with resolution of clock tick,
+    or None, where /proc is not available"""
+
+    try:
+        with open('/proc/self/stat') as stat:
+            ticks = int(stat.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as uptime:
+            return float(uptime.read().split()[0]) - ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def report_startup(budget: float) -> int:
+    """Prints startup phases and returns exit code, which is 1, if startup took more than budget milliseconds"""
+
+    total = sum(duration for name, duration in STARTUP)
+    for name, duration in STARTUP:
+        print(f'{name:<16}{duration * 1000:>10.1f} ms')
+    print(f'{"total":<16}{total * 1000:>10.1f} ms (budget {budget} ms)')
+    return int(total * 1000 > budget)
 
 
 def close_app() -> None:
-    """Closes SQLite Database connection and its cursor"""
+    """Closes connections of all open SQLite databases"""
+
+    db_api.close_all()
+
+
+def get_export_path(name: str) -> str:
+    """Asks file for export of records, which is named by name by default, or returns empty string"""
+
+    rcd_export_dialog = QtWidgets.QFileDialog()
+    rcd_export_dialog.setObjectName('rcdExportDialog')
+    return rcd_export_dialog.getSaveFileName(
+        directory=name,
+        filter='CSV Files (*.csv *.csv.gz);;TSV Files (*.tsv *.tsv.gz);;'
+               'JSON Lines Files (*.jsonl *.jsonl.gz);;SQL Files (*.sql *.sql.gz)')[0]
 
-    CURSOR.close()
-    DB.close()
+
+def get_job_name(job: str) -> str:
+    """Returns object name of maintenance job, e.g. dbVacuumInto for vacuum_into"""
+
+    return 'db' + ''.join(part.title() for part in job.split('_'))
+
+
+def get_size(records: list) -> int:
+    """Returns approximate memory size of records in bytes"""
+
+    return sum(sys.getsizeof(record) + sum(map(sys.getsizeof, record)) for record in records)
 
 
 class MainWindow(QtWidgets.QWidget):
@@ -49,7 +105,7 @@ class MainWindow(QtWidgets.QWidget):
         """Initialize the MainWindow with its UI"""
 
         super().__init__()
-        self.setGeometry(200, 200, 350, 350)
+        self.setGeometry(200, 200, 600, 500)
         self.setObjectName('mainWindow')
         self.setWindowTitle(loc_api.get_lang(f'{self.objectName()}.title'))
         layout = QtWidgets.QVBoxLayout()
@@ -66,23 +122,57 @@ class MainWindow(QtWidgets.QWidget):
         project_group.setLayout(vbox)
         new = QtWidgets.QPushButton()
         new.setObjectName('dbCreate')
-        new.setIcon(QtGui.QIcon('res/ico/common/dbCreateIcon.png'))
+        new.setIcon(style_api.get_icon('res/ico/common/dbCreateIcon.png'))
         vbox.addWidget(new)
         new.setText(loc_api.get_lang(new))
         new.clicked.connect(self.new_db)
         open_ = QtWidgets.QPushButton()
         open_.setObjectName('dbOpen')
-        open_.setIcon(QtGui.QIcon('res/ico/common/dbOpenIcon.png'))
+        open_.setIcon(style_api.get_icon('res/ico/common/dbOpenIcon.png'))
         vbox.addWidget(open_)
         open_.setText(loc_api.get_lang(open_))
         open_.clicked.connect(self.open_db)
+        snapshot = QtWidgets.QPushButton()
+        snapshot.setObjectName('dbSnapshot')
+        snapshot.setIcon(style_api.get_icon('res/ico/common/dbOpenIcon.png'))
+        vbox.addWidget(snapshot)
+        snapshot.setText(loc_api.get_lang(snapshot))
+        snapshot.clicked.connect(self.open_snapshot)
+        profile_group = QtWidgets.QWidget()
+        profile_group.setObjectName('dbProfileGroup')
+        profile_hbox = QtWidgets.QHBoxLayout()
+        profile_hbox.setContentsMargins(0, 0, 0, 0)
+        profile_group.setLayout(profile_hbox)
+        profile_label = QtWidgets.QLabel()
+        profile_label.setObjectName('dbProfileLabel')
+        profile_label.setText(loc_api.get_lang(f'{self.objectName()}.{project_group.objectName()}.'
+                                               f'{profile_label.objectName()}'))
+        profile_hbox.addWidget(profile_label)
+        self.profile = QtWidgets.QComboBox()
+        self.profile.setObjectName('dbProfile')
+        self.profile.addItems(db_api.get_profiles())
+        self.profile.setCurrentText(config_api.CONFIG['DATABASE']['profile'])
+        profile_hbox.addWidget(self.profile, 1)
+        vbox.addWidget(profile_group)
+        self.launcher = QtWidgets.QTreeWidget()
+        self.launcher.setObjectName('dbLauncher')
+        self.launcher.setRootIsDecorated(False)
+        self.launcher.setSortingEnabled(True)
+        self.launcher.sortByColumn(0, QtCore.Qt.AscendingOrder)
+        self.launcher.setHeaderLabels([loc_api.get_lang(f'{self.launcher.objectName()}.{column}') for column in
+                                       ('name', 'size', 'pages', 'tables', 'rows', 'modified')])
+        self.launcher.itemActivated.connect(lambda item: self.show_db(item.data(0, QtCore.Qt.UserRole)))
+        layout.addWidget(self.launcher)
         self.settings = QtWidgets.QPushButton(parent=self)
         self.settings.setObjectName('dbmSettings')
         self.settings.setFixedWidth(25)
         self.settings.setFixedHeight(25)
-        self.settings.setIcon(QtGui.QIcon('res/ico/common/dbmSettings.png'))
+        self.settings.setIcon(style_api.get_icon('res/ico/common/dbmSettings.png'))
         self.settings.move(self.width() - 40, 20)
         self.settings.clicked.connect(self.open_settings)
+        self.db_windows = {}
+        self.scanner = None
+        self.scan_dbs()
 
     def open_settings(self):
         self.settings_window = SettingsWindow()
@@ -92,7 +182,7 @@ class MainWindow(QtWidgets.QWidget):
         """Creates new database"""
 
         db_create_dialog = QtWidgets.QInputDialog()
-        db_create_dialog.setWindowIcon(QtGui.QIcon('res/ico/common/dbEditIcon.png'))
+        db_create_dialog.setWindowIcon(style_api.get_icon('res/ico/common/dbEditIcon.png'))
         db_create_dialog.setObjectName('dbCreateDialog')
         db_create_dialog.setWindowTitle(loc_api.get_lang(f'{db_create_dialog.objectName()}.title'))
         db_create_dialog.setLabelText(loc_api.get_lang(f'{db_create_dialog.objectName()}.name'))
@@ -101,12 +191,7 @@ class MainWindow(QtWidgets.QWidget):
         if db_create_dialog.exec_() == QtWidgets.QInputDialog.Accepted:
             db = db_create_dialog.textValue()
             if db != '':
-                global DB, CURSOR
-                DB = sqlite3.connect(f'db/{db}.s3db')
-                CURSOR = DB.cursor()
-                self.db_win = DatabaseWindow(f'db/{db}.s3db')
-                self.db_win.show()
-                self.hide()
+                self.show_db(f'db/{db}.s3db')
             else:
                 self.error = ErrorDialog('emptyDbName')
                 self.error.show()
@@ -119,61 +204,499 @@ class MainWindow(QtWidgets.QWidget):
         db = db_open_dialog.getOpenFileName(directory='db',
                                             filter='SQLite3 Database Files (*.s3db);;Database Files (*.db)')[0]
         if db != '':
-            global DB, CURSOR
-            DB = sqlite3.connect(db)
-            CURSOR = DB.cursor()
-            self.db_win = DatabaseWindow(db)
-            self.db_win.show()
-            self.hide()
+            self.show_db(db)
+
+    def open_snapshot(self) -> None:
+        """Copies existing database to local temporary file by backup API in background and opens the copy
+        as read-only snapshot, so browsing does not read slow storage of the original"""
+
+        import maintenance_api
+        db_open_dialog = QtWidgets.QFileDialog()
+        db_open_dialog.setObjectName('dbOpenDialog')
+        db = db_open_dialog.getOpenFileName(directory='db',
+                                            filter='SQLite3 Database Files (*.s3db);;Database Files (*.db)')[0]
+        if db != '':
+            handle, path = tempfile.mkstemp(prefix='dbm-snapshot-', suffix=os.path.splitext(db)[1])
+            os.close(handle)
+            worker = maintenance_api.MaintenanceWorker(db, 'backup', path, read_only=True)
+            worker.signals.finished.connect(lambda kb: self.show_db(path, db))
+            worker.signals.failed.connect(self.snapshot_failed)
+            self.progress = JobProgressDialog(worker, 'dbSnapshotDialog')
+            query_api.start(worker)
+            self.progress.show()
+
+    def scan_dbs(self) -> None:
+        """Lists databases of db directory in launcher by launcher_api.ScanWorker, which shows cached entries at once
+        and rescans only new and modified files in background"""
+
+        import launcher_api
+        if self.scanner is not None or not os.path.isdir('db'):
+            return
+        self.scanner = launcher_api.ScanWorker('db')
+        self.scanner.signals.chunk.connect(self.add_db_infos)
+        self.scanner.signals.done.connect(self.scan_done)
+        query_api.start(self.scanner)
+
+    def scan_done(self) -> None:
+        self.scanner = None
+
+    def add_db_infos(self, infos: list) -> None:
+        """Adds or replaces launcher items of databases, where numbers are sorted as numbers"""
+
+        import blob_api
+        self.launcher.setSortingEnabled(False)
+        for info in infos:
+            matches = [self.launcher.topLevelItem(i) for i in range(self.launcher.topLevelItemCount())
+                       if self.launcher.topLevelItem(i).data(0, QtCore.Qt.UserRole) == info.path]
+            item = matches[0] if matches else LauncherItem(self.launcher)
+            modified = time.strftime('%Y-%m-%d %H:%M', time.localtime(info.mtime / 1e9))
+            values = (os.path.basename(info.path), blob_api.get_size_text(info.size), info.pages, info.tables,
+                      '' if info.rows is None else f'~{info.rows}', modified)
+            for column, value in enumerate(values):
+                item.setText(column, str(value))
+            item.setData(0, QtCore.Qt.UserRole, info.path)
+            for column, value in ((1, info.size), (2, info.pages), (3, info.tables), (4, info.rows or 0)):
+                item.setData(column, QtCore.Qt.UserRole, value)
+                item.setTextAlignment(column, QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+            item.setToolTip(0, info.path)
+        self.launcher.setSortingEnabled(True)
+        for column in range(self.launcher.columnCount()):
+            self.launcher.resizeColumnToContents(column)
+
+    def snapshot_failed(self, message: str) -> None:
+        self.error = ErrorDialog('queryFailed', message)
+        self.error.show()
+
+    def show_db(self, db: str, source: str = None) -> None:
+        """Opens database through connection manager and shows its window or activates it, if it is shown already
+
+        Several databases can be open at the same time, each in its own DatabaseWindow. Database is opened
+        with PRAGMA profile selected in main window. If source is given, db is read-only snapshot of source,
+        which is opened with db_api.SNAPSHOT_PROFILE"""
+
+        if db in self.db_windows:
+            self.db_windows[db].activateWindow()
+            return
+        profile = None if source else self.profile.currentText() or None
+        self.db_windows[db] = DatabaseWindow(db_api.open_database(db, profile, source))
+        self.db_windows[db].closed.connect(lambda: (self.db_windows.pop(db, None), self.scan_dbs()))
+        self.db_windows[db].show()
 
     def resizeEvent(self, a0: QtGui.QResizeEvent) -> None:
         self.settings.move(self.width() - 40, 20)
         super().resizeEvent(a0)
 
 
+class LauncherItem(QtWidgets.QTreeWidgetItem):
+    """Item of launcher, which is sorted by number of its UserRole data, if column has it"""
+
+    def __lt__(self, other: QtWidgets.QTreeWidgetItem) -> bool:
+        column = self.treeWidget().sortColumn()
+        value, other_value = self.data(column, QtCore.Qt.UserRole), other.data(column, QtCore.Qt.UserRole)
+        if isinstance(value, int) and isinstance(other_value, int):
+            return value < other_value
+        return super().__lt__(other)
+
+
 class DatabaseWindow(QtWidgets.QWidget):
-    def __init__(self, db_name):
+    closed = QtCore.pyqtSignal()
+
+    @metrics_api.timed('DatabaseWindow')
+    def __init__(self, database: db_api.Database):
         """Creates database window, which contains tables"""
 
         super().__init__()
-        tables = [''.join(i).strip() for i in
-                  CURSOR.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall() if
-                  (i,) not in SYSTEM_TABLES]
+        self.database = database
+        with metrics_api.measure('schema'):
+            tables = self.database.schema.get_tables()
         layout = QtWidgets.QVBoxLayout()
         self.setLayout(layout)
         self.setGeometry(200, 200, 800, 600)
         self.setObjectName('databaseWindow')
-        self.setWindowTitle(loc_api.get_lang(f'{self.objectName()}.title').format(db_name))
+        self.setWindowTitle(loc_api.get_lang(
+            f'{self.objectName()}.{"snapshot" if self.database.read_only else "title"}').format(self.database.source))
+        self.search = QtWidgets.QLineEdit()
+        self.search.setObjectName('dbSearch')
+        self.search.setPlaceholderText(loc_api.get_lang(f'{self.objectName()}.{self.search.objectName()}'))
+        self.search.returnPressed.connect(self.search_records)
+        layout.addWidget(self.search)
+        self.search_results = QtWidgets.QListWidget()
+        self.search_results.setObjectName('dbSearchResults')
+        self.search_results.setVisible(False)
+        self.search_results.itemActivated.connect(self.show_search_result)
+        layout.addWidget(self.search_results)
         self.table_widget = QtWidgets.QTabWidget()
         self.table_widget.setObjectName('tableWidget')
         self.table_widget.setWindowTitle(loc_api.get_lang(self.table_widget))
         self.table_widget.setMovable(True)
         layout.addWidget(self.table_widget)
+        self.session_panel = QtWidgets.QWidget()
+        self.session_panel.setObjectName('sessionPanel')
+        session_layout = QtWidgets.QVBoxLayout()
+        session_layout.setContentsMargins(0, 0, 0, 0)
+        self.session_panel.setLayout(session_layout)
+        self.session_steps = QtWidgets.QListWidget()
+        self.session_steps.setObjectName('sessionSteps')
+        self.session_steps.setMaximumHeight(120)
+        session_layout.addWidget(self.session_steps)
+        session_group = QtWidgets.QWidget()
+        session_group.setObjectName('sessionGroup')
+        session_hbox = QtWidgets.QHBoxLayout()
+        session_hbox.setContentsMargins(0, 0, 0, 0)
+        session_group.setLayout(session_hbox)
+        self.session_buttons = []
+        for name, slot in (('sessionUndo', self.database.session.undo), ('sessionDiscard', self.database.session.clear),
+                           ('sessionCommit', self.commit_session)):
+            button = QtWidgets.QPushButton()
+            button.setObjectName(name)
+            button.setText(loc_api.get_lang(f'{self.objectName()}.{name}'))
+            button.clicked.connect(slot)
+            session_hbox.addWidget(button)
+            self.session_buttons.append(button)
+        self.session_status = QtWidgets.QLabel()
+        self.session_status.setObjectName('sessionStatus')
+        session_hbox.addWidget(self.session_status, 1)
+        session_layout.addWidget(session_group)
+        layout.addWidget(self.session_panel)
+        self.commit_worker = None
+        self.database.session.changed.connect(self.show_session)
+        self.show_session()
+        self.recent_tabs = collections.OrderedDict()
+        self.memory_budget = int(config_api.CONFIG['DATABASE']['memory_budget']) * 1024 * 1024
         for i in range(len(tables)):
-            if tables[i] in SYSTEM_TABLES:
-                continue
-            tab = DatabaseTable()
+            tab = QtWidgets.QWidget()
             tab.setObjectName(tables[i])
             self.table_widget.addTab(tab, tables[i])
-            load_table(tables[i], tab)
+        self.row_counts = {}
+        self.exact_counts = set()
+        self.counter = None
+        self.count_pending = False
+        self.count_timer = QtCore.QTimer(self)
+        self.count_timer.setSingleShot(True)
+        self.count_timer.timeout.connect(self.count_rows)
+        self.table_widget.currentChanged.connect(self.activate_tab)
+        self.activate_tab(self.table_widget.currentIndex())
+        self.refresh_timer = QtCore.QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh_tabs)
+        if int(config_api.CONFIG['DATABASE']['refresh_interval']) > 0:
+            self.refresh_timer.start(int(config_api.CONFIG['DATABASE']['refresh_interval']))
+            self.count_timer.setInterval(int(config_api.CONFIG['DATABASE']['refresh_interval']))
+
+    def activate_tab(self, index: int) -> None:
+        """Loads table of tab on its first activation or after its records were evicted
+        and marks it as the most recently used one"""
+
+        tab = self.table_widget.widget(index)
+        if tab is None or isinstance(tab, DatabaseConsole):
+            return
+        if not isinstance(tab, DatabaseTable):
+            tab = self.build_tab(index)
+        if tab.model() is None:
+            load_table(self.database, tab.objectName(), tab)
+            tab.model().rowsInserted.connect(self.evict_tabs)
+            tab.model().failed.connect(self.query_failed)
+            tab.model().total = self.row_counts.get(tab.objectName())
+        elif not tab.model().records:
+            tab.model().fetchMore()
+        self.recent_tabs[tab.objectName()] = tab
+        self.recent_tabs.move_to_end(tab.objectName())
+        self.evict_tabs()
+        if tab.objectName() not in self.exact_counts:
+            self.count_rows()
+
+    @metrics_api.timed('build_tab')
+    def build_tab(self, index: int) -> 'DatabaseTable':
+        """Replaces placeholder of tab, which is added instead of DatabaseTable until the first activation"""
+
+        placeholder = self.table_widget.widget(index)
+        tab = DatabaseTable(self.database)
+        tab.setObjectName(placeholder.objectName())
+        self.table_widget.blockSignals(True)
+        self.table_widget.insertTab(index, tab, self.table_widget.tabText(index))
+        self.table_widget.removeTab(index + 1)
+        self.table_widget.setCurrentIndex(index)
+        self.table_widget.blockSignals(False)
+        placeholder.deleteLater()
+        return tab
+
+    def evict_tabs(self) -> None:
+        """Replaces least recently used tabs with placeholders, which are loaded again on activation, and deletes
+        them with their records, while loaded records exceed memory_budget from config.ini
+
+        The current tab is never evicted"""
+
+        current = self.table_widget.currentWidget()
+        total = sum(tab.model().size for tab in self.recent_tabs.values())
+        for name, tab in list(self.recent_tabs.items()):
+            if total <= self.memory_budget:
+                break
+            if tab is current:
+                continue
+            total -= tab.model().size
+            del self.recent_tabs[name]
+            index = self.table_widget.indexOf(tab)
+            placeholder = QtWidgets.QWidget()
+            placeholder.setObjectName(name)
+            self.table_widget.blockSignals(True)
+            self.table_widget.insertTab(index, placeholder, self.table_widget.tabText(index))
+            self.remove_tab(tab)
+            self.table_widget.blockSignals(False)
+
+    @metrics_api.timed('refresh_tabs')
+    def refresh_tabs(self) -> None:
+        """Refreshes loaded tabs, if database was modified by other connection or process
+        since the previous check, which is made every refresh_interval ms from config.ini"""
+
+        if self.database.is_changed():
+            for tab in self.recent_tabs.values():
+                tab.refresh()
+            self.count_timer.start()
+
+    @metrics_api.timed('count_rows')
+    def count_rows(self) -> None:
+        """Shows numbers of records of tables on their tabs: exact counts of loaded tables, which are counted
+        by CountWorker, and estimates of the others, which are counted on their activation
+
+        Count, which is not valid for the current state of database, is shown as estimate, and tables, which
+        have no count yet, are estimated by the same worker. Changes restart count_timer, so tables are counted
+        again only after database stays unchanged for refresh_interval, and running worker is not cancelled,
+        but tables are counted again after it is done"""
+
+        import count_api
+        if self.counter is not None:
+            self.count_pending = True
+            return
+        self.count_pending = False
+        state = self.database.get_state()
+        current = self.table_widget.currentWidget()
+        tables = self.database.schema.get_tables()
+        stale = []
+        for table in tables:
+            count = count_api.get_count(self.database.path, table, state)
+            if count is not None:
+                if table not in self.exact_counts:
+                    self.show_count(table, count, True)
+                continue
+            if table in self.exact_counts:
+                self.show_count(table, self.row_counts[table], False)
+            if self.recent_tabs.get(table) is current:
+                stale.insert(0, table)
+            elif table in self.recent_tabs:
+                stale.append(table)
+        estimates = [table for table in tables if table not in self.row_counts]
+        if stale or estimates:
+            counter = count_api.CountWorker(self.database.path, stale, state, estimates)
+            counter.signals.chunk.connect(self.show_counts)
+            counter.signals.done.connect(lambda: self.count_done(counter))
+            self.counter = counter
+            query_api.start(counter)
+
+    def count_done(self, counter: 'count_api.CountWorker') -> None:
+        if self.counter is counter:
+            self.counter = None
+            if self.count_pending:
+                self.count_rows()
+
+    def show_counts(self, counts: list) -> None:
+        for table, count, exact in counts:
+            self.show_count(table, count, exact)
+
+    def show_count(self, table: str, count: int, exact: bool) -> None:
+        """Writes number of records to tab of table, where estimate is marked by ~, and sizes scrollbar
+        of loaded table by it"""
+
+        self.row_counts[table] = count
+        if exact:
+            self.exact_counts.add(table)
+        else:
+            self.exact_counts.discard(table)
+        for i in range(self.table_widget.count()):
+            tab = self.table_widget.widget(i)
+            if tab.objectName() == table and not isinstance(tab, DatabaseConsole):
+                self.table_widget.setTabText(i, loc_api.get_lang(
+                    f'{self.objectName()}.{"tabCount" if exact else "tabEstimate"}').format(table, count))
+                if isinstance(tab, DatabaseTable) and tab.model() is not None:
+                    tab.model().total = count
+                    tab.updateGeometries()
+
+    def show_session(self) -> None:
+        """Lists staged steps of edit session, which panel is shown, while session is not empty"""
+
+        import edit_api
+        steps = self.database.session.steps
+        self.session_steps.clear()
+        self.session_steps.addItems([edit_api.get_text(step) for step in steps])
+        self.session_status.setText(loc_api.get_lang(f'{self.session_status.objectName()}.staged').format(
+            len(steps)) if steps else '')
+        for button in self.session_buttons:
+            button.setEnabled(bool(steps) and self.commit_worker is None)
+        self.session_panel.setVisible(bool(steps))
+
+    def commit_session(self, skip_failed: bool = False) -> None:
+        """Applies all staged steps of edit session in one transaction in background
+
+        If skip_failed is True, failed steps are rolled back to their savepoints and stay staged,
+        while the other ones are committed"""
+
+        import edit_api
+        if not self.database.session.steps or self.commit_worker is not None:
+            return
+        self.commit_worker = edit_api.CommitWorker(self.database.path, self.database.session.steps, skip_failed)
+        self.commit_worker.signals.finished.connect(self.finish_commit)
+        self.commit_worker.signals.failed.connect(self.fail_commit)
+        self.show_session()
+        query_api.start(self.commit_worker)
+
+    def finish_commit(self, count: int) -> None:
+        """Writes committed steps to loaded tabs, removes them from edit session and reports number of statements
+        and duration of commit, until the next step is staged
+
+        Steps, which were staged during commit or skipped by it, stay in edit session"""
+
+        worker = self.commit_worker
+        self.commit_worker = None
+        committed = worker.get_committed()
+        for tab in self.recent_tabs.values():
+            tab.model().apply_steps(committed)
+        self.database.session.remove(committed)
+        self.session_status.setText(loc_api.get_lang(f'{self.session_status.objectName()}.committed').format(
+            count, round(worker.elapsed, 1)))
+        if worker.skipped:
+            self.session_status.setText(loc_api.get_lang(f'{self.session_status.objectName()}.skipped').format(
+                count, round(worker.elapsed, 1), len(worker.skipped)))
+        self.session_panel.setVisible(True)
+
+    def fail_commit(self, message: str) -> None:
+        """Keeps steps of edit session after rolled back commit and selects the failed one
+
+        If other steps may succeed, user can commit them, skipping failed steps"""
+
+        worker = self.commit_worker
+        self.commit_worker = None
+        self.show_session()
+        if worker.failed_step is not None:
+            self.session_steps.setCurrentRow(worker.failed_step)
+        self.session_status.setText(loc_api.get_lang(f'{self.session_status.objectName()}.failed').format(
+            (worker.failed_step or 0) + 1, message))
+        if worker.failed_step is not None and len(worker.edits) > 1 and QtWidgets.QMessageBox.question(
+                self, self.windowTitle(), loc_api.get_lang(f'{self.objectName()}.sessionSkip').format(
+                    worker.failed_step + 1, message)) == QtWidgets.QMessageBox.Yes:
+            self.commit_session(skip_failed=True)
+
+    def search_records(self) -> None:
+        """Searches text of search box in all tables through FTS5 indexes in background, asking before
+        the first indexes are created in database, which is not a snapshot"""
+
+        import search_api
+        self.search_results.clear()
+        self.search_results.setVisible(False)
+        if not self.search.text().strip():
+            return
+        if not self.database.read_only and not search_api.has_indexes(self.database.connection) and \
+                QtWidgets.QMessageBox.question(self, self.windowTitle(), loc_api.get_lang(
+                    f'{self.objectName()}.searchIndex')) != QtWidgets.QMessageBox.Yes:
+            return
+        worker = search_api.SearchWorker(self.database.path, self.search.text())
+        worker.signals.chunk.connect(self.add_search_results)
+        worker.signals.failed.connect(self.query_failed)
+        query_api.start(worker)
+
+    def add_search_results(self, hits: list) -> None:
+        for table, rowid, column in hits:
+            item = QtWidgets.QListWidgetItem(f'{table} #{rowid} - {column}')
+            item.setData(QtCore.Qt.UserRole, (table, rowid, column))
+            self.search_results.addItem(item)
+        self.search_results.setVisible(bool(hits))
+
+    def show_search_result(self, item: QtWidgets.QListWidgetItem) -> None:
+        """Activates tab of found record and scrolls its table to it"""
+
+        table, rowid, column = item.data(QtCore.Qt.UserRole)
+        for i in range(self.table_widget.count()):
+            if self.table_widget.widget(i).objectName() == table:
+                self.table_widget.setCurrentIndex(i)
+                self.table_widget.currentWidget().show_record((rowid,), column)
+                return
+
+    def closeEvent(self, a0: QtGui.QCloseEvent) -> None:
+        """Closes connection of database together with its window, asking before staged changes are discarded"""
+
+        steps = self.database.session.steps
+        if steps and QtWidgets.QMessageBox.question(
+                self, self.windowTitle(), loc_api.get_lang(f'{self.objectName()}.sessionDiscardOnClose').format(
+                    len(steps))) != QtWidgets.QMessageBox.Yes:
+            a0.ignore()
+            return
+        self.refresh_timer.stop()
+        self.count_timer.stop()
+        self.count_pending = False
+        if self.counter is not None:
+            self.counter.cancel()
+        if hasattr(self, 'console'):
+            self.console.cancel_statement()
+        if self.database.read_only:
+            workers = query_api.get_workers(self.database.path)
+            for worker in workers:
+                worker.cancel()
+                worker.signals.done.connect(lambda: self.close_snapshot(workers))
+            QtCore.QTimer.singleShot(0, lambda: self.close_snapshot(workers))
+        else:
+            db_api.close_database(self.database.path)
+        self.closed.emit()
+        super().closeEvent(a0)
+
+    def close_snapshot(self, workers: list) -> None:
+        """Closes snapshot, which file is removed, only when all its workers are done, because connection
+        of late worker would create new empty database at its path
+
+        It is called after every done worker and once more after events, which were already posted by workers
+        done before close, so snapshot is closed exactly when the last worker is done"""
+
+        if not any(worker in query_api.WORKERS for worker in workers):
+            db_api.close_database(self.database.path)
 
     def contextMenuEvent(self, a0: QtGui.QContextMenuEvent) -> None:
         """Calls context menu by RBM clicking"""
 
+        import maintenance_api
         menu = QtWidgets.QMenu()
         menu.setObjectName('dbEditMenu')
         add_table = QtWidgets.QAction(parent=menu)
         add_table.setObjectName('tbAdd')
-        add_table.setIcon(QtGui.QIcon('res/ico/common/tbAddIcon.png'))
+        add_table.setIcon(style_api.get_icon('res/ico/common/tbAddIcon.png'))
         add_table.triggered.connect(self.add_table)
         delete_table = QtWidgets.QAction(parent=menu, icon=QtGui.QIcon(f''))
         delete_table.setObjectName('tbRemove')
-        delete_table.setIcon(QtGui.QIcon('res/ico/common/tbRemoveIcon.png'))
+        delete_table.setIcon(style_api.get_icon('res/ico/common/tbRemoveIcon.png'))
         delete_table.triggered.connect(self.delete_table)
+        open_console = QtWidgets.QAction(parent=menu)
+        open_console.setObjectName('dbConsole')
+        open_console.setIcon(style_api.get_icon('res/ico/common/dbEditIcon.png'))
+        open_console.triggered.connect(self.open_console)
+        advise_indexes = QtWidgets.QAction(parent=menu)
+        advise_indexes.setObjectName('dbAdvise')
+        advise_indexes.setIcon(style_api.get_icon('res/ico/common/dbEditIcon.png'))
+        advise_indexes.triggered.connect(self.advise_indexes)
         menu.addAction(add_table)
         menu.addAction(delete_table)
+        menu.addSeparator()
+        menu.addAction(open_console)
+        menu.addAction(advise_indexes)
+        maintenance = menu.addMenu(loc_api.get_lang(f'{menu.objectName()}.dbMaintenance'))
+        maintenance.setObjectName('dbMaintenance')
+        for job in maintenance_api.JOBS:
+            action = QtWidgets.QAction(parent=maintenance)
+            action.setObjectName(get_job_name(job))
+            action.setText(loc_api.get_lang(f'{maintenance.objectName()}.{action.objectName()}'))
+            action.triggered.connect(lambda checked, job=job: self.run_maintenance(job))
+            maintenance.addAction(action)
         add_table.setText(loc_api.get_lang(add_table))
         delete_table.setText(loc_api.get_lang(delete_table))
+        add_table.setEnabled(not self.database.read_only)
+        delete_table.setEnabled(not self.database.read_only)
+        open_console.setText(loc_api.get_lang(open_console))
+        advise_indexes.setText(loc_api.get_lang(advise_indexes))
+        advise_indexes.setEnabled(not self.database.read_only)
         menu.exec(a0.globalPos())
 
     def add_table(self) -> None:
@@ -182,7 +705,7 @@ class DatabaseWindow(QtWidgets.QWidget):
         tb_create_dialog = QtWidgets.QInputDialog()
         tb_create_dialog.setObjectName('tbCreateDialog')
         tb_create_dialog.setWindowTitle(loc_api.get_lang(f'{tb_create_dialog.objectName()}.title'))
-        tb_create_dialog.setWindowIcon(QtGui.QIcon('res/ico/common/tbAddIcon.png'))
+        tb_create_dialog.setWindowIcon(style_api.get_icon('res/ico/common/tbAddIcon.png'))
         tb_create_dialog.setLabelText(loc_api.get_lang(f'{tb_create_dialog.objectName()}.name'))
         if tb_create_dialog.exec_() == QtWidgets.QInputDialog.Accepted:
             tb = tb_create_dialog.textValue()
@@ -193,14 +716,13 @@ class DatabaseWindow(QtWidgets.QWidget):
                     return
                 elif tb[0] in [str(i) for i in range(10)] + []:
                     pass
-                tab = DatabaseTable()
+                tab = DatabaseTable(self.database)
                 tab.setObjectName(tb)
                 self.cl_edit = ColumnCreateDialog()
                 if self.cl_edit.exec_() == QtWidgets.QDialog.Accepted:
-                    CURSOR.execute(f"CREATE TABLE IF NOT EXISTS {tb} {self.cl_edit.get_sql_command()}")
-                    DB.commit()
-                    self.table_widget.addTab(tab, tb)
-                    load_table(tb, tab)
+                    query_api.execute(self.database.path, f'CREATE TABLE IF NOT EXISTS {query_api.quote(tb)} '
+                                                          f'{self.cl_edit.get_sql_command()}',
+                                      on_finished=lambda rows: self.table_created(tab), on_failed=self.query_failed)
             else:
                 self.error = ErrorDialog('emptyTbName')
                 self.error.show()
@@ -208,11 +730,110 @@ class DatabaseWindow(QtWidgets.QWidget):
     def delete_table(self):
         """Deletes selected table both from DatabaseWindow and from SQLite database"""
 
-        if self.table_widget.currentWidget():
-            table = self.table_widget.currentWidget().objectName()
-            self.table_widget.removeTab(self.table_widget.currentIndex())
-            CURSOR.execute(f'DROP TABLE {table}')
-            DB.commit()
+        if isinstance(self.table_widget.currentWidget(), DatabaseTable):
+            tab = self.table_widget.currentWidget()
+            query_api.execute(self.database.path, f'DROP TABLE {query_api.quote(tab.objectName())}',
+                              on_finished=lambda rows: self.table_deleted(tab), on_failed=self.query_failed)
+
+    def open_console(self) -> None:
+        """Shows SQL console tab, adding it on the first call"""
+
+        if not hasattr(self, 'console'):
+            self.console = DatabaseConsole(self.database)
+            self.table_widget.addTab(self.console, style_api.get_icon('res/ico/common/dbEditIcon.png'),
+                                     loc_api.get_lang(f'{self.console.objectName()}.title'))
+        self.table_widget.setCurrentWidget(self.console)
+
+    def advise_indexes(self) -> None:
+        """Analyzes logged statements of database in background and proposes indexes for them"""
+
+        import advisor_api
+        worker = advisor_api.AdvisorWorker(self.database.path)
+        worker.signals.chunk.connect(self.show_advice)
+        worker.signals.failed.connect(self.query_failed)
+        query_api.start(worker)
+
+    def show_advice(self, advice: list) -> None:
+        """Creates indexes of advice, which are accepted in IndexAdviceDialog, and updates statistics
+        of their tables by ANALYZE in one background worker"""
+
+        import advisor_api
+        self.advice_dialog = IndexAdviceDialog(advice)
+        if self.advice_dialog.exec_() == QtWidgets.QDialog.Accepted and self.advice_dialog.get_advice():
+            worker = advisor_api.IndexWorker(self.database.path, self.advice_dialog.get_advice())
+            worker.signals.failed.connect(self.query_failed)
+            query_api.start(worker)
+
+    def run_maintenance(self, job: str) -> None:
+        """Runs maintenance job of database in background and reports processed and reclaimed bytes,
+        throughput and errors of checks, when it is finished
+
+        Copying jobs ask file of the copy first"""
+
+        import maintenance_api
+        path = None
+        if job in ('backup', 'vacuum_into'):
+            root, extension = os.path.splitext(self.database.path)
+            path = QtWidgets.QFileDialog.getSaveFileName(
+                directory=f'{root}-{job.replace("_", "-")}{extension}',
+                filter='SQLite3 Database Files (*.s3db);;Database Files (*.db)')[0]
+            if not path or os.path.abspath(path) == os.path.abspath(self.database.path):
+                return
+        name = get_job_name(job)
+        worker = maintenance_api.MaintenanceWorker(self.database.path, job, path)
+        errors = []
+        worker.signals.chunk.connect(errors.extend)
+        worker.signals.finished.connect(lambda kb: self.show_maintenance(name, worker, errors))
+        worker.signals.failed.connect(self.query_failed)
+        self.progress = JobProgressDialog(worker, f'{name}Dialog')
+        query_api.start(worker)
+        self.progress.show()
+
+    def show_maintenance(self, name: str, worker: 'maintenance_api.MaintenanceWorker', errors: list) -> None:
+        """Reports duration, processed and reclaimed bytes and throughput of finished maintenance job,
+        and errors found by checks"""
+
+        import blob_api
+        report = QtWidgets.QMessageBox()
+        report.setObjectName('maintenanceReport')
+        report.setWindowTitle(loc_api.get_lang(f'{name}Dialog.title'))
+        rate = int(worker.processed / max(worker.elapsed, 0.001))
+        text = loc_api.get_lang(f'{report.objectName()}.finished').format(
+            round(worker.elapsed, 2), blob_api.get_size_text(worker.processed),
+            blob_api.get_size_text(worker.reclaimed), blob_api.get_size_text(rate))
+        if worker.job in ('quick_check', 'integrity_check'):
+            result = 'errors' if errors else 'ok'
+            text = f'{text}\n{loc_api.get_lang(f"{report.objectName()}.{result}").format(len(errors))}'
+            report.setDetailedText('\n'.join(errors))
+        report.setText(text)
+        self.report = report
+        self.report.show()
+
+    def table_created(self, tab: 'DatabaseTable') -> None:
+        """Shows tab of table, which has been created by add_table"""
+
+        self.table_widget.addTab(tab, tab.objectName())
+        self.table_widget.setCurrentWidget(tab)
+
+    def table_deleted(self, tab: 'DatabaseTable') -> None:
+        """Removes tab of table, which has been dropped by delete_table"""
+
+        self.recent_tabs.pop(tab.objectName(), None)
+        self.remove_tab(tab)
+
+    def remove_tab(self, tab: 'DatabaseTable') -> None:
+        """Removes tab and deletes it with its model, which is disconnected from edit session first"""
+
+        model = tab.model()
+        self.table_widget.removeTab(self.table_widget.indexOf(tab))
+        if model is not None:
+            model.close()
+            model.deleteLater()
+        tab.deleteLater()
+
+    def query_failed(self, message: str) -> None:
+        self.error = ErrorDialog('queryFailed', message)
+        self.error.show()
 
 
 class SettingsWindow(QtWidgets.QWidget):
@@ -229,13 +850,28 @@ class SettingsWindow(QtWidgets.QWidget):
             item = QtWidgets.QListWidgetItem()
             item.setText(list(config_api.CONFIG.keys())[i])
             self.item_group.addItem(item)
-        layout.addWidget(self.item_group)
+        side_group = QtWidgets.QWidget()
+        side_group.setObjectName('sideGroup')
+        side_vbox = QtWidgets.QVBoxLayout()
+        side_group.setLayout(side_vbox)
+        side_vbox.addWidget(self.item_group)
+        metrics = QtWidgets.QPushButton()
+        metrics.setObjectName('stMetrics')
+        metrics.setFixedWidth(100)
+        metrics.setText(loc_api.get_lang(f'{self.objectName()}.{metrics.objectName()}'))
+        metrics.clicked.connect(self.open_metrics)
+        side_vbox.addWidget(metrics)
+        layout.addWidget(side_group)
         self.configurator = QtWidgets.QWidget()
         layout.addWidget(self.configurator)
         self.item_group.setCurrentRow(0)
         self.load_settings()
         self.item_group.itemActivated.connect(self.load_settings)
 
+    def open_metrics(self) -> None:
+        self.metrics_window = MetricsWindow()
+        self.metrics_window.show()
+
     def load_settings(self):
         block = self.item_group.currentItem().text()
         vbox = QtWidgets.QVBoxLayout()
@@ -256,7 +892,7 @@ class SettingsWindow(QtWidgets.QWidget):
 
             param_value = QtWidgets.QLineEdit()
             param_value.setObjectName(f'{list(block_options.keys())[i]}')
-            param_value.setText(list(block_options.values())[i])
+            param_value.setText(str(list(block_options.values())[i]))
 
             hbox.addWidget(param_name)
             hbox.addWidget(param_value)
@@ -264,12 +900,779 @@ class SettingsWindow(QtWidgets.QWidget):
             vbox.addWidget(param_group)
 
 
-class DatabaseTable(QtWidgets.QTableWidget):
-    """Representation of SQLite 3 Database Table"""
+class MetricsWindow(QtWidgets.QWidget):
+    """Panel of instrumentation, which shows latency histograms of SQLite statements, workers and GUI operations
+    and stalls of event loop, so it can be seen, whether slow operation is spent in SQLite, Python or Qt"""
 
     def __init__(self):
         super().__init__()
+        self.setObjectName('metricsWindow')
+        self.setWindowTitle(loc_api.get_lang(f'{self.objectName()}.title'))
+        self.setGeometry(250, 250, 900, 500)
+        layout = QtWidgets.QVBoxLayout()
+        self.setLayout(layout)
+        metrics_group = QtWidgets.QWidget()
+        metrics_group.setObjectName('metricsGroup')
+        metrics_hbox = QtWidgets.QHBoxLayout()
+        metrics_group.setLayout(metrics_hbox)
+        enabled = QtWidgets.QCheckBox()
+        enabled.setObjectName('metricsEnabled')
+        enabled.setChecked(metrics_api.ENABLED)
+        enabled.toggled.connect(metrics_api.enable)
+        reset = QtWidgets.QPushButton()
+        reset.setObjectName('metricsReset')
+        reset.clicked.connect(lambda: (metrics_api.reset(), self.show_metrics()))
+        dump = QtWidgets.QPushButton()
+        dump.setObjectName('metricsDump')
+        dump.clicked.connect(self.dump_metrics)
+        for widget in (enabled, reset, dump):
+            widget.setText(loc_api.get_lang(f'{self.objectName()}.{widget.objectName()}'))
+            metrics_hbox.addWidget(widget)
+        metrics_hbox.addStretch(1)
+        layout.addWidget(metrics_group)
+        self.tree = QtWidgets.QTreeWidget()
+        self.tree.setObjectName('metricsTree')
+        self.tree.setHeaderLabels([loc_api.get_lang(f'{self.objectName()}.{column}') for column in
+                                   ('name', 'count', 'total', 'p50', 'p95', 'max', 'rows')])
+        layout.addWidget(self.tree)
+        self.timer = QtCore.QTimer(self)
+        self.timer.timeout.connect(self.show_metrics)
+        self.timer.start(1000)
+        self.show_metrics()
+
+    def show_metrics(self) -> None:
+        """Fills tree by current metrics, where operations of every section are sorted by their total time"""
+
+        expanded = {self.tree.topLevelItem(i).text(0) for i in range(self.tree.topLevelItemCount())
+                    if self.tree.topLevelItem(i).isExpanded()}
+        self.tree.clear()
+        for section, histograms in metrics_api.get_metrics().items():
+            title = loc_api.get_lang(f'{self.objectName()}.{section}')
+            section_item = QtWidgets.QTreeWidgetItem(self.tree, [title])
+            for name, histogram in sorted(histograms.items(), key=lambda i: -i[1]['total_ms']):
+                item = QtWidgets.QTreeWidgetItem(section_item, [' '.join(name.split())] + [
+                    str(histogram[key]) for key in ('count', 'total_ms', 'p50_ms', 'p95_ms', 'max_ms', 'rows')])
+                item.setToolTip(0, '\n'.join(f'{bucket} ms: {count}'
+                                             for bucket, count in histogram['buckets'].items() if count))
+            section_item.setExpanded(title in expanded or not expanded)
+
+    def dump_metrics(self) -> None:
+        path = QtWidgets.QFileDialog.getSaveFileName(directory='metrics.json', filter='JSON Files (*.json)')[0]
+        if path:
+            metrics_api.dump(path)
+
+    def closeEvent(self, a0: QtGui.QCloseEvent) -> None:
+        self.timer.stop()
+        super().closeEvent(a0)
+
+
+class DatabaseTableModel(QtCore.QAbstractTableModel):
+    """Model of SQLite 3 Database Table, that fetches records on demand by windows of fetch_size rows
+
+    Windows are selected by keyset pagination on rowid (or on primary key for WITHOUT ROWID tables),
+    so fetching any window costs the same as fetching the first one. Sorting and filters are pushed down
+    to ORDER BY and parameterized WHERE of window queries. Records of sorted column are paged in two phases,
+    NULL values and other ones, which are ordered like SQLite does it, so both can be read by index
+
+    failed(str) signal reports errors of background fetches and refreshes"""
+
+    failed = QtCore.pyqtSignal(str)
+
+    def __init__(self, database: db_api.Database, table: str, parent: QtCore.QObject = None):
+        super().__init__(parent)
+        self.database = database
+        self.table = table
+        with metrics_api.measure('schema'):
+            description = database.schema.get_table(table)
+        self.columns = description.columns
+        self.key = description.key
+        self.types = [style_api.get_affinity(column[2]) for column in self.columns]
+        self.fetch_size = int(config_api.CONFIG['DATABASE']['fetch_size'])
+        self.records = []
+        self.keys = []
+        self.last_key = None
+        self.last_value = None
+        self.phase = 0
+        self.inclusive = False
+        self.exhausted = False
+        self.size = 0
+        self.worker = None
+        self.refresher = None
+        self.sort_column = -1
+        self.sort_order = QtCore.Qt.AscendingOrder
+        self.filters = {}
+        self.total = None
+        self.wanted = 0
+        self.session = database.session
+        self.session.changed.connect(self.show_session)
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.records)
+
+    def columnCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == QtCore.Qt.DisplayRole:
+            import blob_api
+            return blob_api.get_text(self.get_value(index.row(), index.column()))
+        if role == QtCore.Qt.EditRole:
+            value = self.get_value(index.row(), index.column())
+            return '' if value is None else str(value)
+        if role == TYPE_ROLE:
+            return 'null' if self.get_value(index.row(), index.column()) is None else self.types[index.column()]
+        if role in (QtCore.Qt.BackgroundRole, QtCore.Qt.FontRole):
+            state = self.get_state(index.row(), index.column())
+            if state is not None:
+                style = style_api.get_edit_style(style_api.get_theme(), state)
+                return style.background if role == QtCore.Qt.BackgroundRole else style.font
+        return None
+
+    def flags(self, index: QtCore.QModelIndex) -> QtCore.Qt.ItemFlags:
+        """Cells of tables with key are editable, except primary key columns, BLOB previews and deleted records"""
+
+        import blob_api
+        flags = super().flags(index)
+        if index.isValid() and self.key and not self.database.read_only and not self.columns[index.column()][5] and \
+                not isinstance(self.records[index.row()][index.column()], blob_api.BlobPreview) and \
+                not self.session.is_deleted(self.table, self.keys[index.row()]):
+            flags |= QtCore.Qt.ItemIsEditable
+        return flags
+
+    def setData(self, index: QtCore.QModelIndex, value, role: int = QtCore.Qt.EditRole) -> bool:
+        """Stages update of cell in edit session, where empty text of non-text column means NULL"""
+
+        if not index.isValid() or role != QtCore.Qt.EditRole or value == self.data(index, role):
+            return False
+        if value == '' and self.types[index.column()] != 'text':
+            value = None
+        self.session.update(self.table, self.key, [self.keys[index.row()]], {self.columns[index.column()][1]: value})
+        return True
+
+    def get_value(self, row: int, column: int):
+        """Returns value of cell, which is replaced with its staged value, if it is changed in edit session"""
+
+        value = self.records[row][column]
+        if self.key:
+            value = self.session.get_value(self.table, self.keys[row], self.columns[column][1], value)
+        return value
+
+    def get_state(self, row: int, column: int) -> str:
+        """Returns name of edit style of cell, which is deleted or changed in edit session, or None"""
+
+        if not self.key:
+            return None
+        if self.session.is_deleted(self.table, self.keys[row]):
+            return 'deleted'
+        if self.session.is_changed(self.table, self.keys[row], self.columns[column][1]):
+            return 'changed'
+        return None
+
+    def show_session(self) -> None:
+        """Repaints fetched records, which values may be staged or unstaged in edit session"""
+
+        if self.records:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self.records) - 1, len(self.columns) - 1))
+
+    @metrics_api.timed('apply_steps')
+    def apply_steps(self, steps: list) -> None:
+        """Writes values of committed updates to fetched records and removes deleted records, so table
+        is not fetched again, and appends inserted records, if records are ordered by key and all of them
+        were fetched"""
+
+        steps = [step for step in steps if step.table == self.table]
+        if not self.key or not steps:
+            return
+        rows = {self.keys[row]: row for row in range(len(self.keys))}
+        names = {self.columns[i][1]: i for i in range(len(self.columns))}
+        updated = set()
+        deleted = set()
+        for step in steps:
+            for key in step.keys or ():
+                row = rows.get(key)
+                if row is None:
+                    continue
+                if step.kind == 'delete':
+                    deleted.add(row)
+                elif step.kind == 'update':
+                    record = list(self.records[row])
+                    for column, value in step.values.items():
+                        record[names[column]] = value
+                    self.records[row] = tuple(record)
+                    updated.add(row)
+        if updated:
+            self.dataChanged.emit(self.index(min(updated), 0), self.index(max(updated), len(self.columns) - 1))
+        self.remove_rows(sorted(deleted))
+        if any(step.kind == 'insert' for step in steps) and self.exhausted and self.sort_column < 0:
+            self.exhausted = False
+            self.fetchMore()
+
+    def remove_rows(self, rows: list) -> None:
+        """Removes ascending rows from fetched records by spans of contiguous rows from the last one"""
+
+        end = len(rows)
+        while end:
+            start = end - 1
+            while start and rows[start - 1] == rows[start] - 1:
+                start -= 1
+            first, last = rows[start], rows[end - 1]
+            self.beginRemoveRows(QtCore.QModelIndex(), first, last)
+            self.size -= get_size(self.records[first:last + 1])
+            del self.records[first:last + 1]
+            del self.keys[first:last + 1]
+            self.endRemoveRows()
+            end = start
+
+    def headerData(self, section: int, orientation: QtCore.Qt.Orientation, role: int = QtCore.Qt.DisplayRole):
+        if orientation == QtCore.Qt.Horizontal:
+            if role == QtCore.Qt.DisplayRole:
+                return self.columns[section][1]
+            if role == QtCore.Qt.DecorationRole:
+                return style_api.get_type_style(style_api.get_theme(), self.types[section]).icon
+        return super().headerData(section, orientation, role)
+
+    def canFetchMore(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> bool:
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> None:
+        """Starts fetching of next window of records, which follows the last fetched key, in background"""
+
+        if parent.isValid() or self.exhausted or self.worker is not None:
+            return
+        self.worker = query_api.QueryWorker(self.database.path, *self.get_window_query(), chunk_size=self.fetch_size)
+        self.worker.signals.chunk.connect(self.insert_records)
+        self.worker.signals.finished.connect(self.finish_fetch)
+        self.worker.signals.failed.connect(self.fail_fetch)
+        query_api.start(self.worker)
+
+    @metrics_api.timed('insert_records')
+    def insert_records(self, window: list) -> None:
+        """Appends window of records fetched by worker"""
+
+        self.beginInsertRows(QtCore.QModelIndex(), len(self.records), len(self.records) + len(window) - 1)
+        self.inclusive = False
+        if self.key:
+            self.last_key = window[-1][:len(self.key)]
+            self.keys.extend(record[:len(self.key)] for record in window)
+        window = self.convert_records([record[len(self.key):] for record in window], self.get_previews())
+        if self.key:
+            if self.sort_column >= 0:
+                self.last_value = window[-1][self.sort_column]
+        self.records.extend(window)
+        self.size += get_size(window)
+        self.endInsertRows()
+
+    def finish_fetch(self, rows: int) -> None:
+        """Switches to the next phase or, after the last one, marks model as exhausted,
+        if worker has fetched less than a window"""
+
+        self.worker = None
+        if rows < self.fetch_size:
+            if self.phase + 1 < len(self.get_phases()):
+                self.phase += 1
+                self.last_key = None
+                self.last_value = None
+                self.fetchMore()
+            else:
+                self.exhausted = True
+        elif len(self.records) < self.wanted:
+            self.fetchMore()
+
+    def fetch_to(self, row: int) -> None:
+        """Fetches windows of records one by one, until row is fetched, so scrollbar, which is sized by total,
+        can be dragged beyond fetched records"""
+
+        self.wanted = row + 1
+        if len(self.records) < self.wanted:
+            self.fetchMore()
+
+    def get_extent(self) -> int:
+        """Returns estimated number of records, which are not fetched yet, or 0, if records are filtered"""
+
+        if self.exhausted or self.filters or self.total is None:
+            return 0
+        return max(self.total - len(self.records), 0)
+
+    def fail_fetch(self, message: str) -> None:
+        """Marks model as exhausted, so failed window is not fetched again and again, and reports error"""
+
+        self.exhausted = True
+        self.worker = None
+        self.failed.emit(message)
+
+    def cancel_fetch(self) -> None:
+        """Cancels running fetch, so records of its window are not appended"""
+
+        if self.worker is not None:
+            self.worker.signals.chunk.disconnect(self.insert_records)
+            self.worker.signals.finished.disconnect(self.finish_fetch)
+            self.worker.signals.failed.disconnect(self.fail_fetch)
+            self.worker.cancel()
+            self.worker = None
+
+    def close(self) -> None:
+        """Cancels background fetch and refresh and disconnects model from edit session, before it is deleted"""
+
+        self.cancel_fetch()
+        if self.refresher is not None:
+            self.refresher.signals.finished.disconnect()
+            self.refresher.signals.failed.disconnect(self.failed)
+            self.refresher.signals.done.disconnect(self.finish_refresh)
+            self.refresher.cancel()
+            self.refresher = None
+        self.session.changed.disconnect(self.show_session)
+
+    def refresh(self, first: int, last: int) -> None:
+        """Fetches records of rows from first to last again in background, removing deleted ones,
+        and, if records are ordered by key and all of them were fetched, appends records inserted
+        after the last fetched key"""
+
+        if self.key and self.records and self.refresher is None:
+            keys = self.keys[first:min(last + 1, first + self.fetch_size)]
+            placeholders = ', '.join('?' * len(self.key))
+            values = ', '.join(f'({placeholders})' for _ in keys)
+            records = []
+            previews = self.get_previews()
+            self.refresher = query_api.QueryWorker(
+                self.database.path,
+                f'SELECT {", ".join(self.key)}, {self.get_projection()} FROM {query_api.quote(self.table)} '
+                f'WHERE ({", ".join(self.key)}) IN (VALUES {values})',
+                [value for key in keys for value in key], chunk_size=len(keys))
+            self.refresher.signals.chunk.connect(records.extend)
+            self.refresher.signals.finished.connect(lambda rows: self.update_records(first, keys, records, previews))
+            self.refresher.signals.failed.connect(self.failed)
+            self.refresher.signals.done.connect(self.finish_refresh)
+            query_api.start(self.refresher)
+        if self.exhausted and self.sort_column < 0:
+            self.exhausted = False
+            self.fetchMore()
+
+    @metrics_api.timed('update_records')
+    def update_records(self, first: int, keys: list, records: list, previews: frozenset) -> None:
+        """Replaces changed records of rows, that still have the same keys, and removes rows,
+        which records were not fetched again"""
+
+        fetched = dict(zip((record[:len(self.key)] for record in records),
+                           self.convert_records([record[len(self.key):] for record in records], previews)))
+        for row in reversed(range(first, first + len(keys))):
+            if row >= len(self.keys) or self.keys[row] != keys[row - first]:
+                continue
+            record = fetched.get(keys[row - first])
+            if record is None:
+                self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+                self.size -= get_size(self.records[row:row + 1])
+                del self.records[row]
+                del self.keys[row]
+                self.endRemoveRows()
+            elif record != self.records[row]:
+                self.size += get_size([record]) - get_size(self.records[row:row + 1])
+                self.records[row] = record
+                self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.columns) - 1))
+
+    def finish_refresh(self) -> None:
+        self.refresher = None
+
+    def get_previews(self) -> frozenset:
+        """Returns indexes of BLOB affinity columns, which values are selected as blob_api.BlobPreview
+
+        Sorted column is selected as is, because its values are compared by keyset pagination"""
+
+        return frozenset(i for i in range(len(self.columns)) if self.types[i] == 'blob' and i != self.sort_column)
+
+    def get_projection(self) -> str:
+        import blob_api
+        previews = self.get_previews()
+        return ', '.join(blob_api.get_preview_projection(query_api.quote(self.columns[i][1])) if i in previews
+                         else query_api.quote(self.columns[i][1]) for i in range(len(self.columns)))
+
+    def convert_records(self, records: list, previews: frozenset) -> list:
+        """Packs size and head of BLOB values of preview columns, which are selected by get_projection(),
+        to blob_api.BlobPreview"""
+
+        import blob_api
+        if not previews:
+            return records
+        converted = []
+        for record in records:
+            values = []
+            position = 0
+            for i in range(len(self.columns)):
+                if i in previews:
+                    size, value = record[position:position + 2]
+                    values.append(value if size is None else blob_api.BlobPreview(size, value))
+                    position += 2
+                else:
+                    values.append(record[position])
+                    position += 1
+            converted.append(tuple(values))
+        return converted
+
+    def get_phases(self) -> tuple:
+        """Returns phases of pagination, where NULL values of sorted column go first in ascending order
+        and last in descending one"""
+
+        if self.sort_column < 0:
+            return 'key',
+        return ('null', 'value') if self.sort_order == QtCore.Qt.AscendingOrder else ('value', 'null')
+
+    def get_window_query(self) -> tuple:
+        """Returns SQL command and its parameters, that select next window of records"""
+
+        table = query_api.quote(self.table)
+        conditions = []
+        params = []
+        for column, text in self.filters.items():
+            condition, condition_params = query_api.compile_filter(query_api.quote(self.columns[column][1]), text)
+            conditions.append(condition)
+            params.extend(condition_params)
+        direction = ' DESC' if self.sort_order == QtCore.Qt.DescendingOrder else ''
+        sort_column = query_api.quote(self.columns[self.sort_column][1]) if self.sort_column >= 0 else None
+        if not self.key:
+            where = f' WHERE {" AND ".join(conditions)}' if conditions else ''
+            order = f' ORDER BY {sort_column}{direction}' if sort_column else ''
+            return f'SELECT {self.get_projection()} FROM {table}{where}{order} LIMIT ? OFFSET ?', \
+                (*params, self.fetch_size, len(self.records))
+        key = ', '.join(self.key)
+        placeholders = ', '.join('?' * len(self.key))
+        operator = '<' if direction else '>'
+        order = ', '.join(f'{column}{direction}' for column in self.key)
+        phase = self.get_phases()[self.phase]
+        if phase == 'null':
+            conditions.append(f'{sort_column} IS NULL')
+        elif phase == 'value':
+            conditions.append(f'{sort_column} IS NOT NULL')
+            order = f'{sort_column}{direction}, {order}'
+        if self.last_key is not None:
+            if phase == 'value':
+                conditions.append(f'{sort_column} {operator}= ? AND '
+                                  f'({sort_column} {operator} ? OR ({key}) {operator} ({placeholders}))')
+                params.extend((self.last_value, self.last_value))
+            else:
+                conditions.append(f'({key}) {operator}{"=" if self.inclusive else ""} ({placeholders})')
+            params.extend(self.last_key)
+        where = f' WHERE {" AND ".join(conditions)}' if conditions else ''
+        return f'SELECT {key}, {self.get_projection()} FROM {table}{where} ORDER BY {order} LIMIT ?', \
+            (*params, self.fetch_size)
+
+    def sort(self, column: int, order: QtCore.Qt.SortOrder = QtCore.Qt.AscendingOrder) -> None:
+        """Orders records by column, or by key if column is negative, and fetches them again"""
+
+        self.sort_column = column
+        self.sort_order = order
+        self.reload()
+
+    def seek(self, key: tuple) -> None:
+        """Fetches records again in key order, starting from the record with key"""
+
+        self.sort_column = -1
+        self.unload()
+        self.last_key = key
+        self.inclusive = True
+        self.fetchMore()
+
+    def set_filter(self, column: int, text: str) -> None:
+        """Sets filter of column, which is removed if text is empty, and fetches records again"""
+
+        if text.strip():
+            self.filters[column] = text
+        else:
+            self.filters.pop(column, None)
+        self.reload()
+
+    def unload(self) -> None:
+        """Drops all fetched records, so they will be fetched again from the first window"""
+
+        self.cancel_fetch()
+        self.beginResetModel()
+        self.records = []
+        self.keys = []
+        self.last_key = None
+        self.last_value = None
+        self.phase = 0
+        self.inclusive = False
+        self.exhausted = False
+        self.size = 0
+        self.wanted = 0
+        self.endResetModel()
+
+    def reload(self) -> None:
+        """Drops all fetched records and fetches the first window again"""
+
+        self.unload()
+        self.fetchMore()
+
+
+class QueryResultModel(QtCore.QAbstractTableModel):
+    """Model of SQL query result, which pages are fetched on demand from PagedQueryWorker"""
+
+    def __init__(self, worker: query_api.PagedQueryWorker, parent: QtCore.QObject = None):
+        super().__init__(parent)
+        self.worker = worker
+        self.columns = []
+        self.records = []
+        self.requested = True
+        self.exhausted = False
+        worker.signals.described.connect(self.set_columns)
+        worker.signals.chunk.connect(self.insert_records)
+        worker.signals.done.connect(self.finish_fetch)
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.records)
+
+    def columnCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == QtCore.Qt.DisplayRole:
+            import blob_api
+            return blob_api.get_text(self.records[index.row()][index.column()])
+        if role == TYPE_ROLE:
+            return style_api.get_value_type(self.records[index.row()][index.column()])
+        return None
+
+    def headerData(self, section: int, orientation: QtCore.Qt.Orientation, role: int = QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal and section < len(self.columns):
+            return self.columns[section]
+        return super().headerData(section, orientation, role)
+
+    def canFetchMore(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> bool:
+        return not parent.isValid() and not self.exhausted and not self.requested
+
+    def fetchMore(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> None:
+        """Requests the next page of records from worker"""
+
+        if self.canFetchMore(parent):
+            self.requested = True
+            self.worker.fetch_more()
+
+    def set_columns(self, columns: list) -> None:
+        self.beginResetModel()
+        self.columns = columns
+        self.endResetModel()
+
+    def insert_records(self, page: list) -> None:
+        self.beginInsertRows(QtCore.QModelIndex(), len(self.records), len(self.records) + len(page) - 1)
+        self.records.extend(page)
+        self.endInsertRows()
+        self.requested = False
+
+    def finish_fetch(self) -> None:
+        self.exhausted = True
+
+
+class DatabaseConsole(QtWidgets.QWidget):
+    """SQL console, which executes statement in background, streams its result into table by pages,
+    measures it and shows its EXPLAIN QUERY PLAN, where full scans are highlighted"""
+
+    def __init__(self, database: db_api.Database):
+        super().__init__()
+        self.database = database
+        self.worker = None
+        self.timer = QtCore.QElapsedTimer()
+        self.setObjectName('dbConsole')
+        layout = QtWidgets.QVBoxLayout()
+        self.setLayout(layout)
+        self.editor = QtWidgets.QPlainTextEdit()
+        self.editor.setObjectName('consoleEditor')
+        self.editor.setPlaceholderText(loc_api.get_lang(f'{self.objectName()}.{self.editor.objectName()}'))
+        self.editor.setMaximumHeight(150)
+        layout.addWidget(self.editor)
+        console_group = QtWidgets.QWidget()
+        console_group.setObjectName('consoleGroup')
+        console_hbox = QtWidgets.QHBoxLayout()
+        console_group.setLayout(console_hbox)
+        run = QtWidgets.QPushButton()
+        run.setObjectName('consoleRun')
+        run.clicked.connect(self.run_statement)
+        cancel = QtWidgets.QPushButton()
+        cancel.setObjectName('consoleCancel')
+        cancel.clicked.connect(self.cancel_statement)
+        export = QtWidgets.QPushButton()
+        export.setObjectName('consoleExport')
+        export.clicked.connect(self.export_statement)
+        self.status = QtWidgets.QLabel()
+        self.status.setObjectName('consoleStatus')
+        console_hbox.addWidget(run)
+        console_hbox.addWidget(cancel)
+        console_hbox.addWidget(export)
+        console_hbox.addWidget(self.status, 1)
+        layout.addWidget(console_group)
+        run.setText(loc_api.get_lang(f'{self.objectName()}.{run.objectName()}'))
+        cancel.setText(loc_api.get_lang(f'{self.objectName()}.{cancel.objectName()}'))
+        export.setText(loc_api.get_lang(f'{self.objectName()}.{export.objectName()}'))
+        splitter = QtWidgets.QSplitter(QtCore.Qt.Vertical)
+        self.results = QtWidgets.QTableView()
+        self.results.setObjectName('consoleResults')
+        self.results.verticalHeader().setVisible(False)
+        self.results.setItemDelegate(DatabaseDelegate(self.results))
+        self.plan = QtWidgets.QTreeWidget()
+        self.plan.setObjectName('consolePlan')
+        self.plan.setHeaderLabels([loc_api.get_lang(f'{self.objectName()}.{self.plan.objectName()}')])
+        splitter.addWidget(self.results)
+        splitter.addWidget(self.plan)
+        splitter.setStretchFactor(0, 3)
+        layout.addWidget(splitter, 1)
+
+    def run_statement(self) -> None:
+        """Executes statement of editor in background and explains its query plan"""
+
+        self.cancel_statement()
+        sql = self.editor.toPlainText().strip()
+        if not sql:
+            return
+        self.worker = query_api.PagedQueryWorker(self.database.path, sql,
+                                                 chunk_size=int(config_api.CONFIG['DATABASE']['fetch_size']))
+        self.results.setModel(QueryResultModel(self.worker, self.results))
+        self.worker.signals.chunk.connect(self.update_status)
+        self.worker.signals.finished.connect(self.finish_statement)
+        self.worker.signals.failed.connect(self.fail_statement)
+        self.worker.signals.cancelled.connect(self.fail_statement)
+        self.timer.start()
+        query_api.start(self.worker)
+        self.plan.clear()
+        explain = query_api.QueryWorker(self.database.path, f'EXPLAIN QUERY PLAN {sql}')
+        explain.signals.chunk.connect(self.show_plan)
+        query_api.start(explain)
+
+    def cancel_statement(self) -> None:
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker = None
+
+    def export_statement(self) -> None:
+        """Writes all records of query of editor to CSV, TSV, JSON-lines or SQL file in background,
+        where SQL dump inserts them into query_result table"""
+
+        import export_api
+        sql = self.editor.toPlainText().strip()
+        path = get_export_path('query_result') if sql else ''
+        if path != '':
+            worker = export_api.ExportWorker(self.database.path, sql, path)
+            worker.signals.failed.connect(self.window().query_failed)
+            self.progress = JobProgressDialog(worker, 'rcdExportDialog')
+            query_api.start(worker)
+            self.progress.show()
+
+    def update_status(self) -> None:
+        self.status.setText(loc_api.get_lang(f'{self.status.objectName()}.fetched').format(
+            self.results.model().rowCount(), self.timer.elapsed()))
+
+    def finish_statement(self, rows: int) -> None:
+        self.status.setText(loc_api.get_lang(f'{self.status.objectName()}.finished').format(
+            rows, self.timer.elapsed()))
+        self.worker = None
+
+    def fail_statement(self, message: str = None) -> None:
+        self.status.setText(loc_api.get_lang(f'{self.status.objectName()}.failed').format(
+            message or loc_api.get_lang(f'{self.status.objectName()}.cancelled')))
+        self.worker = None
+
+    @metrics_api.timed('show_plan')
+    def show_plan(self, records: list) -> None:
+        """Builds tree of EXPLAIN QUERY PLAN records, where full table scans are painted with null type style"""
+
+        items = {0: self.plan.invisibleRootItem()}
+        scan = style_api.get_type_style(style_api.get_theme(), 'null')
+        for id_, parent, _, detail in records:
+            item = QtWidgets.QTreeWidgetItem(items.get(parent, items[0]), [detail])
+            if detail.startswith('SCAN') and ' INDEX ' not in detail:
+                item.setForeground(0, scan.color or QtGui.QColor('red'))
+            items[id_] = item
+        self.plan.expandAll()
+
+
+class DatabaseDelegate(QtWidgets.QStyledItemDelegate):
+    """Paints cells of DatabaseTable by type styles of their values, which are compiled once per theme"""
+
+    def __init__(self, parent: QtCore.QObject = None):
+        super().__init__(parent)
+        self.theme = style_api.get_theme()
+
+    def initStyleOption(self, option: QtWidgets.QStyleOptionViewItem, index: QtCore.QModelIndex) -> None:
+        super().initStyleOption(option, index)
+        style = style_api.get_type_style(self.theme, index.data(TYPE_ROLE))
+        if style.color is not None:
+            option.palette.setColor(QtGui.QPalette.Text, style.color)
+        option.displayAlignment = style.alignment
+        if style.font is not None:
+            option.font = style.font
+
+
+class DatabaseHeader(QtWidgets.QHeaderView):
+    """Horizontal header of DatabaseTable with filter editor under every section"""
+
+    filter_changed = QtCore.pyqtSignal(int, str)
+
+    def __init__(self, parent: QtWidgets.QWidget = None):
+        super().__init__(QtCore.Qt.Horizontal, parent)
+        self.editors = []
+        self.setObjectName('tbHeader')
+        self.setSectionsClickable(True)
+        self.setSortIndicatorShown(True)
+        self.setSortIndicator(-1, QtCore.Qt.AscendingOrder)
+        self.sectionResized.connect(self.adjust_editors)
+        self.sectionMoved.connect(self.adjust_editors)
+
+    def setModel(self, model: QtCore.QAbstractItemModel) -> None:
+        super().setModel(model)
+        for editor in self.editors:
+            editor.deleteLater()
+        self.editors = []
+        for i in range(model.columnCount() if model is not None else 0):
+            editor = QtWidgets.QLineEdit(self)
+            editor.setObjectName('rcdFilter')
+            editor.setPlaceholderText(loc_api.get_lang(f'{editor.objectName()}.placeholder'))
+            editor.editingFinished.connect(lambda column=i, editor=editor:
+                                           self.filter_changed.emit(column, editor.text()))
+            editor.show()
+            self.editors.append(editor)
+        self.adjust_editors()
+
+    def get_editor_height(self) -> int:
+        return self.editors[0].sizeHint().height() if self.editors else 0
+
+    def sizeHint(self) -> QtCore.QSize:
+        size = super().sizeHint()
+        size.setHeight(size.height() + self.get_editor_height())
+        return size
+
+    def updateGeometries(self) -> None:
+        self.setViewportMargins(0, 0, 0, self.get_editor_height())
+        super().updateGeometries()
+        self.adjust_editors()
+
+    def adjust_editors(self) -> None:
+        """Places filter editors under their sections"""
+
+        top = self.height() - self.get_editor_height()
+        for i in range(len(self.editors)):
+            self.editors[i].setGeometry(self.sectionViewportPosition(i), top, self.sectionSize(i),
+                                        self.get_editor_height())
+
+    def scrollContentsBy(self, dx: int, dy: int) -> None:
+        super().scrollContentsBy(dx, dy)
+        self.adjust_editors()
+
+
+class DatabaseTable(QtWidgets.QTableView):
+    """Representation of SQLite 3 Database Table
+
+    Header clicks sort and header editors filter records on the side of SQLite"""
+
+    def __init__(self, database: db_api.Database):
+        super().__init__()
+        self.database = database
         self.verticalHeader().setVisible(False)
+        self.setItemDelegate(DatabaseDelegate(self))
+        header = DatabaseHeader(self)
+        self.setHorizontalHeader(header)
+        header.filter_changed.connect(lambda column, text: self.model().set_filter(column, text))
+        self.setSortingEnabled(True)
+        self.verticalScrollBar().valueChanged.connect(self.fetch_visible)
 
     def contextMenuEvent(self, a0: QtGui.QContextMenuEvent) -> None:
         tb_edit_menu = QtWidgets.QMenu()
@@ -278,40 +1681,224 @@ class DatabaseTable(QtWidgets.QTableWidget):
         add_rcd.setObjectName('tbAddRcd')
         remove_rcd = QtWidgets.QAction(parent=tb_edit_menu)
         remove_rcd.setObjectName('tbRemoveRcd')
+        set_value = QtWidgets.QAction(parent=tb_edit_menu)
+        set_value.setObjectName('tbSetValue')
         add_rcd.setText(loc_api.get_lang(add_rcd))
         remove_rcd.setText(loc_api.get_lang(remove_rcd))
+        set_value.setText(loc_api.get_lang(set_value))
         add_rcd.triggered.connect(self.add_rcd)
         remove_rcd.triggered.connect(self.remove_rcd)
-        add_rcd.setIcon(QtGui.QIcon('res/ico/common/rcdAddIcon.png'))
-        remove_rcd.setIcon(QtGui.QIcon('res/ico/common/rcdRemoveIcon.png'))
+        set_value.triggered.connect(self.set_value)
+        remove_rcd.setEnabled(bool(self.model().key) and bool(self.get_selected_rows()))
+        set_value.setEnabled(bool(self.model().key) and self.currentIndex().isValid() and
+                             not self.model().columns[self.currentIndex().column()][5])
+        add_rcd.setIcon(style_api.get_icon('res/ico/common/rcdAddIcon.png'))
+        remove_rcd.setIcon(style_api.get_icon('res/ico/common/rcdRemoveIcon.png'))
         add_cl = QtWidgets.QAction(parent=tb_edit_menu)
         add_cl.setObjectName('tbAddCl')
         remove_cl = QtWidgets.QAction(parent=tb_edit_menu)
         remove_cl.setObjectName('tbRemoveCl')
         add_cl.setText(loc_api.get_lang(add_cl))
         remove_cl.setText(loc_api.get_lang(remove_cl))
-        add_cl.setIcon(QtGui.QIcon('res/ico/common/tbAddIcon.png'))
-        remove_cl.setIcon(QtGui.QIcon('res/ico/common/tbRemoveIcon.png'))
+        add_cl.setIcon(style_api.get_icon('res/ico/common/tbAddIcon.png'))
+        remove_cl.setIcon(style_api.get_icon('res/ico/common/tbRemoveIcon.png'))
         tb_edit_menu.addAction(add_cl)
         tb_edit_menu.addAction(remove_cl)
         tb_edit_menu.addSeparator()
+        import_rcd = QtWidgets.QAction(parent=tb_edit_menu)
+        import_rcd.setObjectName('tbImportRcd')
+        import_rcd.setText(loc_api.get_lang(import_rcd))
+        import_rcd.setIcon(style_api.get_icon('res/ico/common/rcdAddIcon.png'))
+        import_rcd.triggered.connect(self.import_rcd)
         tb_edit_menu.addAction(add_rcd)
         tb_edit_menu.addAction(remove_rcd)
+        tb_edit_menu.addAction(set_value)
+        export_rcd = QtWidgets.QAction(parent=tb_edit_menu)
+        export_rcd.setObjectName('tbExportRcd')
+        export_rcd.setText(loc_api.get_lang(export_rcd))
+        export_rcd.triggered.connect(self.export_rcd)
+        tb_edit_menu.addAction(import_rcd)
+        tb_edit_menu.addAction(export_rcd)
+        profile_table = QtWidgets.QAction(parent=tb_edit_menu)
+        profile_table.setObjectName('tbProfile')
+        profile_table.setText(loc_api.get_lang(profile_table))
+        profile_table.triggered.connect(self.profile_table)
+        open_blob = QtWidgets.QAction(parent=tb_edit_menu)
+        open_blob.setObjectName('tbOpenBlob')
+        open_blob.setText(loc_api.get_lang(open_blob))
+        open_blob.setEnabled(self.is_blob(self.currentIndex()))
+        open_blob.triggered.connect(self.open_blob)
+        tb_edit_menu.addSeparator()
+        tb_edit_menu.addAction(profile_table)
+        tb_edit_menu.addAction(open_blob)
+        for action in (add_rcd, remove_rcd, set_value, add_cl, remove_cl, import_rcd):
+            action.setEnabled(action.isEnabled() and not self.database.read_only)
         tb_edit_menu.exec(a0.globalPos())
 
-    def add_rcd(self):  # TODO
-        columns = CURSOR.execute(
-            f"PRAGMA table_info({self.objectName()})").fetchall()
+    def updateGeometries(self) -> None:
+        """Extends range of vertical scrollbar by estimated number of records, which are not fetched yet,
+        so scrollbar is sized by the whole table"""
+
+        extent = self.model().get_extent() if self.model() is not None else 0
+        if not extent:
+            super().updateGeometries()
+            return
+        if self.verticalScrollMode() == QtWidgets.QAbstractItemView.ScrollPerPixel:
+            extent *= self.verticalHeader().defaultSectionSize()
+        bar = self.verticalScrollBar()
+        value = bar.value()
+        # range of fetched records would clamp position, which is dragged beyond them
+        bar.blockSignals(True)
+        super().updateGeometries()
+        bar.setMaximum(bar.maximum() + extent)
+        bar.blockSignals(False)
+        bar.setValue(value)
+
+    def fetch_visible(self, value: int) -> None:
+        """Fetches records, which are shown by scrollbar position, if it is beyond fetched records"""
+
+        if self.model() is None:
+            return
+        if self.verticalScrollMode() == QtWidgets.QAbstractItemView.ScrollPerPixel:
+            value //= self.verticalHeader().defaultSectionSize()
+        last = value + self.viewport().height() // self.verticalHeader().defaultSectionSize()
+        if last >= self.model().rowCount():
+            self.model().fetch_to(last)
+
+    def refresh(self) -> None:
+        """Refreshes records of visible rows and appends new ones, if table was modified outside"""
+
+        if self.model() is not None and self.model().rowCount():
+            first = max(self.rowAt(0), 0)
+            last = self.rowAt(self.viewport().height() - 1)
+            self.model().refresh(first, last if last >= 0 else self.model().rowCount() - 1)
+
+    def show_record(self, key: tuple, column: str) -> None:
+        """Shows table from the record with key in key order and selects its column"""
+
+        self.horizontalHeader().blockSignals(True)
+        self.horizontalHeader().setSortIndicator(-1, QtCore.Qt.AscendingOrder)
+        self.horizontalHeader().blockSignals(False)
+        names = [i[1] for i in self.model().columns]
+        self.pending_column = names.index(column) if column in names else 0
+        self.model().rowsInserted.connect(self.select_pending_record)
+        self.model().seek(key)
+
+    def select_pending_record(self) -> None:
+        """Selects the first record, which has been fetched after show_record"""
+
+        self.model().rowsInserted.disconnect(self.select_pending_record)
+        self.setCurrentIndex(self.model().index(0, self.pending_column))
+        self.scrollTo(self.currentIndex())
+
+    def add_rcd(self) -> None:
+        """Stages insert of record, which is entered in RecordCreateDialog, in edit session"""
+
+        columns = self.model().columns
         self.rcd_edit = RecordCreateDialog(columns)
         self.rcd_edit.show()
         if self.rcd_edit.exec_() == QtWidgets.QDialog.Accepted:
-            comm = f"INSERT into {self.objectName()} " \
-                   f"({', '.join([column[1] for column in columns])}) {self.rcd_edit.get_sql_command()}"
-            CURSOR.execute(comm)
-            DB.commit()
-
-    def remove_rcd(self):  # TODO
-        pass
+            values = self.rcd_edit.get_values()
+            self.database.session.insert(self.objectName(), {
+                columns[i][1]: None if values[i] == '' and self.model().types[i] != 'text' else values[i]
+                for i in range(len(columns))})
+
+    def import_rcd(self) -> None:
+        """Streams records from CSV, TSV or JSON-lines file into table in background"""
+
+        rcd_import_dialog = QtWidgets.QFileDialog()
+        rcd_import_dialog.setObjectName('rcdImportDialog')
+        path = rcd_import_dialog.getOpenFileName(filter='Record Files (*.csv *.tsv *.jsonl *.ndjson)')[0]
+        if path != '':
+            import import_api
+            header = True
+            if import_api.FORMATS.get(os.path.splitext(path)[1].lower(), 'csv') != 'jsonl':
+                answer = QtWidgets.QMessageBox.question(
+                    self, loc_api.get_lang(f'{rcd_import_dialog.objectName()}.title'),
+                    loc_api.get_lang(f'{rcd_import_dialog.objectName()}.header'),
+                    QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No | QtWidgets.QMessageBox.Cancel)
+                if answer == QtWidgets.QMessageBox.Cancel:
+                    return
+                header = answer == QtWidgets.QMessageBox.Yes
+            worker = import_api.ImportWorker(self.database.path, self.objectName(), self.model().columns, path,
+                                             header)
+            worker.signals.finished.connect(lambda rows: self.model().reload())
+            worker.signals.failed.connect(self.window().query_failed)
+            self.progress = JobProgressDialog(worker, 'rcdImportDialog')
+            query_api.start(worker)
+            self.progress.show()
+
+    def export_rcd(self) -> None:
+        """Writes all records of table to CSV, TSV, JSON-lines or SQL file in background, gzipped for .gz names"""
+
+        path = get_export_path(self.objectName())
+        if path != '':
+            import export_api
+            worker = export_api.ExportWorker(self.database.path, f'SELECT * FROM {query_api.quote(self.objectName())}',
+                                             path, self.objectName())
+            worker.signals.failed.connect(self.window().query_failed)
+            self.progress = JobProgressDialog(worker, 'rcdExportDialog')
+            query_api.start(worker)
+            self.progress.show()
+
+    def profile_table(self) -> None:
+        self.profile_window = ProfileWindow(self.database, self.objectName())
+        self.profile_window.show()
+
+    def is_blob(self, index: QtCore.QModelIndex) -> bool:
+        """Returns whether cell of rowid table has BLOB affinity or BLOB value, so it can be opened in BlobViewer"""
+
+        import blob_api
+        if not index.isValid() or self.model().key != ('_rowid_',):
+            return False
+        return self.model().types[index.column()] == 'blob' or \
+            isinstance(self.model().records[index.row()][index.column()], (bytes, blob_api.BlobPreview))
+
+    def open_blob(self) -> None:
+        """Shows BLOB of the current cell in BlobViewer and refreshes the cell, when it is replaced there"""
+
+        index = self.currentIndex()
+        model = self.model()
+        self.blob_viewer = BlobViewer(self.database, model.table, model.columns[index.column()][1],
+                                      model.keys[index.row()][0])
+        self.blob_viewer.changed.connect(lambda: model.refresh(index.row(), index.row()))
+        self.blob_viewer.show()
+
+    def get_selected_rows(self) -> list:
+        """Returns ascending rows of selection, which are collected from its ranges instead of selected cells"""
+
+        rows = set()
+        for selection_range in self.selectionModel().selection() if self.selectionModel() is not None else ():
+            rows.update(range(selection_range.top(), selection_range.bottom() + 1))
+        return sorted(rows)
+
+    def remove_rcd(self) -> None:
+        """Stages delete of selected records in edit session as one step"""
+
+        model = self.model()
+        rows = self.get_selected_rows()
+        if model.key and rows:
+            self.database.session.delete(model.table, model.key, [model.keys[row] for row in rows])
+
+    def set_value(self) -> None:
+        """Stages update of column of the current cell to the entered value for all selected records as one step,
+        where empty text of non-text column means NULL"""
+
+        model = self.model()
+        column = self.currentIndex().column()
+        rows = self.get_selected_rows() or [self.currentIndex().row()]
+        rcd_set_dialog = QtWidgets.QInputDialog()
+        rcd_set_dialog.setObjectName('rcdSetDialog')
+        rcd_set_dialog.setWindowTitle(loc_api.get_lang(f'{rcd_set_dialog.objectName()}.title'))
+        rcd_set_dialog.setLabelText(loc_api.get_lang(f'{rcd_set_dialog.objectName()}.value').format(
+            model.columns[column][1], len(rows)))
+        rcd_set_dialog.setTextValue(self.currentIndex().data(QtCore.Qt.EditRole))
+        if rcd_set_dialog.exec_() == QtWidgets.QInputDialog.Accepted:
+            value = rcd_set_dialog.textValue()
+            if value == '' and model.types[column] != 'text':
+                value = None
+            self.database.session.update(model.table, model.key, [model.keys[row] for row in rows],
+                                         {model.columns[column][1]: value})
 
 
 class ColumnCreateDialog(QtWidgets.QDialog):
@@ -321,7 +1908,7 @@ class ColumnCreateDialog(QtWidgets.QDialog):
         super().__init__()
         layout = QtWidgets.QVBoxLayout()
         self.setLayout(layout)
-        self.setWindowIcon(QtGui.QIcon('res/ico/common/tbEditIcon.png'))
+        self.setWindowIcon(style_api.get_icon('res/ico/common/tbEditIcon.png'))
         self.setObjectName('clCreateDialog')
         self.setWindowTitle(loc_api.get_lang(f'{self.objectName()}.title'))
         cl_group = QtWidgets.QWidget()
@@ -351,7 +1938,7 @@ class ColumnCreateDialog(QtWidgets.QDialog):
         self.cl_type = QtWidgets.QComboBox()
         self.cl_type.setObjectName('clType')
         for i in PROVIDED_TYPES:
-            self.cl_type.addItem(QtGui.QIcon(f'res/ico/type/{i.lower()}_128.png'), i, userData=i)
+            self.cl_type.addItem(style_api.get_icon(f'res/ico/type/{i.lower()}_128.png'), i, userData=i)
         self.cl_type.currentIndexChanged.connect(self.cl_type_changed)
         cl_type_vbox.addWidget(cl_type_label)
         cl_type_vbox.addWidget(self.cl_type)
@@ -514,7 +2101,7 @@ class RecordCreateDialog(QtWidgets.QDialog):
         self.fields = []
         self.setObjectName('rcdCreateDialog')
         self.setWindowTitle(loc_api.get_lang(f'{self.objectName()}.title'))
-        self.setWindowIcon(QtGui.QIcon('res/ico/common/rcdAddIcon.png'))
+        self.setWindowIcon(style_api.get_icon('res/ico/common/rcdAddIcon.png'))
         self.setLayout(layout)
         for i in range(len(columns)):
             field_group = QtWidgets.QWidget()
@@ -544,14 +2131,62 @@ class RecordCreateDialog(QtWidgets.QDialog):
         decline.clicked.connect(self.hide)
         layout.addWidget(dialog_group)
 
-    def get_sql_command(self):
-        comm = ', '.join(['\'' + field.text() + '\'' for field in self.fields])
-        return f'VALUES ({comm})'
+    def get_values(self) -> tuple:
+        """Returns values of fields, which are bound to INSERT command parameters"""
+
+        return tuple(field.text() for field in self.fields)
 
     def accept(self):
         super().accept()
 
 
+class IndexAdviceDialog(QtWidgets.QDialog):
+    """Shows proposed indexes with number and logged time of statements, that they would improve,
+    and change of their query plan, where accepted ones can be checked"""
+
+    def __init__(self, advice: list):
+        import advisor_api
+        super().__init__()
+        layout = QtWidgets.QVBoxLayout()
+        self.setObjectName('idxAdviceDialog')
+        self.setWindowTitle(loc_api.get_lang(f'{self.objectName()}.title'))
+        self.setWindowIcon(style_api.get_icon('res/ico/common/dbEditIcon.png'))
+        self.setLayout(layout)
+        self.advice_list = QtWidgets.QListWidget()
+        self.advice_list.setObjectName('idxAdviceList')
+        for i in advice:
+            item = QtWidgets.QListWidgetItem(loc_api.get_lang(f'{self.objectName()}.advice').format(
+                advisor_api.get_index_sql(i), i.statements, round(i.elapsed, 1), i.before, i.after))
+            item.setData(QtCore.Qt.UserRole, i)
+            item.setFlags(item.flags() | QtCore.Qt.ItemIsUserCheckable)
+            item.setCheckState(QtCore.Qt.Checked)
+            self.advice_list.addItem(item)
+        if not advice:
+            self.advice_list.addItem(loc_api.get_lang(f'{self.objectName()}.empty'))
+        layout.addWidget(self.advice_list)
+        dialog_group = QtWidgets.QGroupBox()
+        dialog_group.setObjectName('dialogGroup')
+        dialog_hbox = QtWidgets.QHBoxLayout()
+        dialog_group.setLayout(dialog_hbox)
+        accept = QtWidgets.QPushButton()
+        decline = QtWidgets.QPushButton()
+        accept.setObjectName('dialogAccept')
+        decline.setObjectName('dialogDecline')
+        dialog_hbox.addWidget(accept)
+        dialog_hbox.addWidget(decline)
+        accept.setText(loc_api.get_lang(accept))
+        decline.setText(loc_api.get_lang(decline))
+        accept.clicked.connect(self.accept)
+        decline.clicked.connect(self.reject)
+        layout.addWidget(dialog_group)
+
+    def get_advice(self) -> list:
+        """Returns checked Advice"""
+
+        return [self.advice_list.item(i).data(QtCore.Qt.UserRole) for i in range(self.advice_list.count())
+                if self.advice_list.item(i).checkState() == QtCore.Qt.Checked]
+
+
 class DatabaseLineEdit(QtWidgets.QLineEdit):
     def __init__(self, sql_type: str, default: str = None, not_null: bool = 0):
         super().__init__()
@@ -562,36 +2197,262 @@ class DatabaseLineEdit(QtWidgets.QLineEdit):
         self.setPlaceholderText(
             loc_api.get_lang(f"{self.objectName()}.{'required' if self.not_null else 'notRequired'}"))
         self.setText(dflt)
-        self.setStyleSheet('\n'.join(open(f'stylesheet/default/type/{self.type.lower()}.qss').readlines()))
+        self.setStyleSheet(style_api.get_type_stylesheet(style_api.get_theme(), style_api.get_affinity(self.type)))
+
+
+class BlobViewer(QtWidgets.QDialog):
+    """Hex viewer of BLOB of cell, which reads it by pages of blob_api.PAGE_SIZE through Connection.blobopen
+    and streams it to file or file into the cell in background"""
 
+    changed = QtCore.pyqtSignal()
 
-class DatabaseLabel(QtWidgets.QLabel):
-    def __init__(self, sql_type: str):
+    def __init__(self, database: db_api.Database, table: str, column: str, rowid: int):
         super().__init__()
-        self.setObjectName('rcdEl')
-        self.type = sql_type
-        self.setStyleSheet('\n'.join(open(f'stylesheet/default/type/{self.type.lower()}.qss').readlines()))
+        self.database = database
+        self.table = table
+        self.column = column
+        self.rowid = rowid
+        self.page = 0
+        self.setObjectName('blobViewer')
+        self.setWindowTitle(loc_api.get_lang(f'{self.objectName()}.title').format(table, column, rowid))
+        self.setGeometry(250, 250, 640, 480)
+        layout = QtWidgets.QVBoxLayout()
+        self.setLayout(layout)
+        self.info = QtWidgets.QLabel()
+        self.info.setObjectName('blobInfo')
+        layout.addWidget(self.info)
+        self.dump = QtWidgets.QPlainTextEdit()
+        self.dump.setObjectName('blobDump')
+        self.dump.setReadOnly(True)
+        self.dump.setLineWrapMode(QtWidgets.QPlainTextEdit.NoWrap)
+        self.dump.setFont(QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.FixedFont))
+        layout.addWidget(self.dump)
+        blob_group = QtWidgets.QWidget()
+        blob_group.setObjectName('blobGroup')
+        blob_hbox = QtWidgets.QHBoxLayout()
+        blob_group.setLayout(blob_hbox)
+        previous = QtWidgets.QPushButton()
+        previous.setObjectName('blobPrevious')
+        previous.clicked.connect(lambda: self.move_page(-1))
+        following = QtWidgets.QPushButton()
+        following.setObjectName('blobNext')
+        following.clicked.connect(lambda: self.move_page(1))
+        self.page_label = QtWidgets.QLabel()
+        self.page_label.setObjectName('blobPage')
+        save = QtWidgets.QPushButton()
+        save.setObjectName('blobSave')
+        save.clicked.connect(self.save_blob)
+        load = QtWidgets.QPushButton()
+        load.setObjectName('blobLoad')
+        load.clicked.connect(self.load_blob)
+        for widget in (previous, self.page_label, following, None, save, load):
+            if widget is None:
+                blob_hbox.addStretch(1)
+                continue
+            blob_hbox.addWidget(widget)
+            if isinstance(widget, QtWidgets.QPushButton):
+                widget.setText(loc_api.get_lang(f'{self.objectName()}.{widget.objectName()}'))
+        layout.addWidget(blob_group)
+        self.show_page()
+
+    def show_page(self) -> None:
+        """Reads the current page of BLOB and shows its hex dump"""
+
+        import blob_api
+        size, data = blob_api.read_page(self.database.connection, self.table, self.column, self.rowid, self.page)
+        pages = max(-(-size // blob_api.PAGE_SIZE), 1)
+        if self.page >= pages:
+            self.page = pages - 1
+            size, data = blob_api.read_page(self.database.connection, self.table, self.column, self.rowid, self.page)
+        self.info.setText(blob_api.get_text(blob_api.BlobPreview(size, data[:blob_api.PREVIEW_SIZE])) if size
+                          else loc_api.get_lang(f'{self.objectName()}.empty'))
+        self.dump.setPlainText(blob_api.get_hex_dump(data, self.page * blob_api.PAGE_SIZE))
+        self.page_label.setText(loc_api.get_lang(f'{self.objectName()}.page').format(self.page + 1, pages))
+
+    def move_page(self, step: int) -> None:
+        self.page = max(self.page + step, 0)
+        self.show_page()
+
+    def save_blob(self) -> None:
+        """Streams BLOB to file in background"""
+
+        import blob_api
+        path = QtWidgets.QFileDialog.getSaveFileName(directory=f'{self.table}_{self.column}_{self.rowid}.bin')[0]
+        if path != '':
+            self.start_worker(blob_api.BlobWorker(self.database.path, self.table, self.column, self.rowid, path),
+                              'blobSaveDialog')
+
+    def load_blob(self) -> None:
+        """Streams file into the cell in background, replacing its value"""
+
+        import blob_api
+        path = QtWidgets.QFileDialog.getOpenFileName()[0]
+        if path != '':
+            worker = blob_api.BlobWorker(self.database.path, self.table, self.column, self.rowid, path, to_file=False)
+            worker.signals.finished.connect(lambda size: (self.show_page(), self.changed.emit()))
+            self.start_worker(worker, 'blobLoadDialog')
+
+    def start_worker(self, worker: 'blob_api.BlobWorker', obj_name: str) -> None:
+        worker.signals.failed.connect(self.copy_failed)
+        self.progress = JobProgressDialog(worker, obj_name)
+        query_api.start(worker)
+        self.progress.show()
+
+    def copy_failed(self, message: str) -> None:
+        self.error = ErrorDialog('queryFailed', message)
+        self.error.show()
+
+
+class ProfileWindow(QtWidgets.QWidget):
+    """Shows NULL and distinct values, minimum, maximum, storage classes and histogram of every column of table,
+    which are profiled by ProfileWorker in background or read from its cache"""
+
+    def __init__(self, database: db_api.Database, table: str):
+        super().__init__()
+        self.database = database
+        self.table = table
+        self.worker = None
+        self.setObjectName('profileWindow')
+        self.setWindowTitle(loc_api.get_lang(f'{self.objectName()}.title').format(table))
+        self.setGeometry(250, 250, 900, 500)
+        layout = QtWidgets.QVBoxLayout()
+        self.setLayout(layout)
+        profile_group = QtWidgets.QWidget()
+        profile_group.setObjectName('profileGroup')
+        profile_hbox = QtWidgets.QHBoxLayout()
+        profile_group.setLayout(profile_hbox)
+        self.info = QtWidgets.QLabel()
+        self.info.setObjectName('profileInfo')
+        refresh = QtWidgets.QPushButton()
+        refresh.setObjectName('profileRefresh')
+        refresh.setText(loc_api.get_lang(f'{self.objectName()}.{refresh.objectName()}'))
+        refresh.clicked.connect(lambda: self.start_profile(False))
+        profile_hbox.addWidget(self.info, 1)
+        profile_hbox.addWidget(refresh)
+        layout.addWidget(profile_group)
+        self.tree = QtWidgets.QTreeWidget()
+        self.tree.setObjectName('profileTree')
+        self.tree.setHeaderLabels([loc_api.get_lang(f'{self.objectName()}.{column}') for column in
+                                   ('name', 'type', 'nulls', 'distinct', 'min', 'max', 'types')])
+        layout.addWidget(self.tree)
+        self.start_profile()
+
+    def start_profile(self, cached: bool = True) -> None:
+        """Profiles table in background, reusing cached profile, if cached is True and database is not changed"""
+
+        import profile_api
+        self.cancel_profile()
+        self.worker = profile_api.ProfileWorker(self.database.path, self.table, self.database.get_state(),
+                                                int(config_api.CONFIG['DATABASE']['profile_sample_size']), cached)
+        self.worker.signals.chunk.connect(self.show_profile)
+        self.worker.signals.failed.connect(self.info.setText)
+        self.info.setText(loc_api.get_lang(f'{self.objectName()}.running'))
+        query_api.start(self.worker)
+
+    def cancel_profile(self) -> None:
+        if self.worker is not None:
+            self.worker.signals.chunk.disconnect(self.show_profile)
+            self.worker.cancel()
+            self.worker = None
+
+    def show_profile(self, profiles: list) -> None:
+        """Fills tree by profiles of columns, where storage classes, that differ from declared type,
+        are painted with null type style, and histogram bins are child items"""
+
+        profile = profiles[0]
+        self.worker = None
+        state = 'sampled' if profile.sampled < profile.rows else 'full'
+        self.info.setText(loc_api.get_lang(f'{self.objectName()}.{state}').format(profile.sampled, profile.rows))
+        self.tree.clear()
+        mismatch = style_api.get_type_style(style_api.get_theme(), 'null').color or QtGui.QColor('red')
+        for column in profile.columns:
+            item = QtWidgets.QTreeWidgetItem(self.tree, [
+                column.name, column.affinity, str(column.nulls), str(column.distinct), column.min or '',
+                column.max or '', ', '.join(f'{type_}: {count}' for type_, count in column.types.items())])
+            if column.affinity != 'blob' and set(column.types) - {column.affinity, 'null'}:
+                item.setForeground(6, mismatch)
+            top = max((count for label, count in column.histogram), default=0)
+            for label, count in column.histogram:
+                QtWidgets.QTreeWidgetItem(item, [label, f'{"#" * round(count / top * 20)} {count}'])
+        self.tree.resizeColumnToContents(0)
+
+    def closeEvent(self, a0: QtGui.QCloseEvent) -> None:
+        self.cancel_profile()
+        super().closeEvent(a0)
+
+
+class JobProgressDialog(QtWidgets.QProgressDialog):
+    """Shows progress of background worker in records and records per second and cancels worker on decline"""
+
+    def __init__(self, worker: query_api.QueryWorker, obj_name: str):
+        super().__init__()
+        self.setObjectName(obj_name)
+        self.setWindowTitle(loc_api.get_lang(f'{self.objectName()}.title'))
+        self.setCancelButtonText(loc_api.get_lang('dialogGroup.dialogDecline'))
+        self.setRange(0, 0)
+        self.setMinimumDuration(0)
+        self.timer = QtCore.QElapsedTimer()
+        self.timer.start()
+        self.canceled.connect(worker.cancel)
+        worker.signals.progress.connect(self.update_progress)
+        worker.signals.done.connect(self.hide)
+
+    def update_progress(self, rows: int) -> None:
+        rate = rows * 1000 // max(self.timer.elapsed(), 1)
+        self.setLabelText(loc_api.get_lang(f'{self.objectName()}.progress').format(rows, rate))
 
 
 class ErrorDialog(QtWidgets.QMessageBox):
-    def __init__(self, err_key: str):
+    def __init__(self, err_key: str, *args):
         super().__init__()
         self.setObjectName('errorDialog')
         self.setWindowTitle(loc_api.get_lang(f'{self.objectName()}.title'))
-        self.setWindowIcon(QtGui.QIcon('res/ico/common/errorIcon.png'))
-        self.setText(loc_api.get_lang(f'{self.objectName()}.{err_key}'))
+        self.setWindowIcon(style_api.get_icon('res/ico/common/errorIcon.png'))
+        self.setText(loc_api.get_lang(f'{self.objectName()}.{err_key}').format(*args))
+
+
+class FirstPaintFilter(QtCore.QObject):
+    """Event filter, which calls callback, when the first paint event of widget has been processed"""
+
+    def __init__(self, widget: QtWidgets.QWidget, callback):
+        super().__init__(widget)
+        self.widget = widget
+        self.callback = callback
+        widget.installEventFilter(self)
+
+    def eventFilter(self, a0: QtCore.QObject, a1: QtCore.QEvent) -> bool:
+        if a0 is self.widget and a1.type() == QtCore.QEvent.Paint:
+            self.widget.removeEventFilter(self)
+            QtCore.QTimer.singleShot(0, self.callback)
+        return False
 
 
 if __name__ == '__main__':
-    config_api.load_config()
+    age = get_process_age()
+    if age is not None:
+        STARTUP.append(('interpreter', max(age - (time.perf_counter() - STARTED), 0)))
+    STARTUP.append(('imports', time.perf_counter() - STARTED))
+    with startup_phase('config'):
+        config_api.load_config()
     sys.excepthook = lambda cls, exception, traceback: sys.__excepthook__(cls, exception, traceback)
-    loc_api.load_lang()
-    with open(f'stylesheet/{config_api.CONFIG["APPEARANCE"]["style"]}') as style:
-        stylesheet = '\n'.join(style.readlines())
-    app = QtWidgets.QApplication(sys.argv)
-    app.setStyleSheet(stylesheet)
-    app.setWindowIcon(QtGui.QIcon('res/ico/common/dbmIcon.png'))
-    win = MainWindow()
-    win.show()
-    if app.exec_():
-        close_app()
+    with startup_phase('lang'):
+        loc_api.load_lang()
+    with startup_phase('stylesheet'):
+        with open(f'stylesheet/{config_api.CONFIG["APPEARANCE"]["style"]}') as style:
+            stylesheet = style.read()
+    with startup_phase('application'):
+        app = QtWidgets.QApplication(sys.argv)
+        app.setStyleSheet(stylesheet)
+        app.setWindowIcon(style_api.get_icon('res/ico/common/dbmIcon.png'))
+        app.aboutToQuit.connect(query_api.shutdown)
+        app.aboutToQuit.connect(close_app)
+    with startup_phase('main window'):
+        win = MainWindow()
+        win.show()
+    metrics_api.load_metrics()
+    if '--profile-startup' in sys.argv:
+        first_frame = time.perf_counter()
+        win.first_paint = FirstPaintFilter(win, lambda: (
+            STARTUP.append(('first frame', time.perf_counter() - first_frame)),
+            app.exit(report_startup(config_api.CONFIG['PERFORMANCE']['startup_budget']))))
+    sys.exit(app.exec_())
@@ -0,0 +1,145 @@
+import os
+import sqlite3
+import time
+
+import db_api
+import query_api
+
+JOBS = ('backup', 'vacuum_into', 'incremental_vacuum', 'quick_check', 'integrity_check')
+
+BACKUP_PAGES = 1024
+
+VACUUM_PAGES = 256
+
+CHECK_ERRORS = 100
+
+
+def get_pragma(connection: sqlite3.Connection, name: str) -> int:
+    return connection.execute(f'PRAGMA {name}').fetchone()[0]
+
+
+class MaintenanceWorker(query_api.QueryWorker):
+    """Runs maintenance job of database in background through its own connection, so database window is not blocked
+
+        backup - online copy to path by Connection.backup, which copies pages pages per step, so other connections
+    can write between steps
+        vacuum_into - compacted copy to path by VACUUM INTO
+        incremental_vacuum - PRAGMA incremental_vacuum(pages) in separate transactions, until freelist is empty
+        quick_check, integrity_check - PRAGMA quick_check or integrity_check, which errors are delivered
+    by chunk(list) signal
+
+    progress(int) signal reports processed KB (progress handler calls for checks), finished(int) reports their total.
+    processed and reclaimed keep bytes of processed and freed pages, elapsed keeps duration of job in seconds.
+    If copying job fails or is cancelled, partially written file is removed. Database of read_only job is opened
+    by db_api.connect_read_only(), so its file is not changed by PRAGMA of profile"""
+
+    def __init__(self, db_path: str, job: str, path: str = None, pages: int = None, read_only: bool = False):
+        super().__init__(db_path, '')
+        self.job = job
+        self.read_only = read_only
+        self.path = path
+        self.pages = pages or (BACKUP_PAGES if job == 'backup' else VACUUM_PAGES)
+        self.page_size = 0
+        self.processed = 0
+        self.reclaimed = 0
+        self.elapsed = 0.0
+
+    def run(self) -> None:
+        connection = None
+        start = time.perf_counter()
+        try:
+            if self.read_only:
+                connection = db_api.connect_read_only(self.db_path, isolation_level=None)
+            else:
+                connection = db_api.connect(self.db_path, isolation_level=None)
+            self.connection = connection
+            if self.job in ('backup', 'vacuum_into') and os.path.exists(self.path):
+                os.remove(self.path)
+            getattr(self, self.job)(connection)
+            self.elapsed = time.perf_counter() - start
+            self.signals.finished.emit(self.processed // 1024)
+        except (sqlite3.Error, OSError) as e:
+            if connection is not None and connection.in_transaction:
+                connection.rollback()
+            if self.job in ('backup', 'vacuum_into') and self.path and os.path.exists(self.path):
+                os.remove(self.path)
+            if self.is_cancelled:
+                self.signals.cancelled.emit()
+            else:
+                self.signals.failed.emit(str(e))
+        finally:
+            self.connection = None
+            if connection is not None:
+                connection.close()
+            self.signals.done.emit()
+
+    def on_copy_progress(self, status: int, remaining: int, total: int) -> None:
+        """Progress callback of Connection.backup, which aborts backup, if worker is cancelled"""
+
+        if self.is_cancelled:
+            raise sqlite3.OperationalError('interrupted')
+        self.processed = (total - remaining) * self.page_size
+        self.signals.progress.emit(self.processed // 1024)
+
+    def on_file_progress(self) -> int:
+        """SQLite progress handler, which reports size of file, written by VACUUM INTO"""
+
+        try:
+            self.processed = os.path.getsize(self.path)
+        except OSError:
+            pass
+        self.signals.progress.emit(self.processed // 1024)
+        return self.is_cancelled
+
+    def backup(self, connection: sqlite3.Connection) -> None:
+        self.page_size = get_pragma(connection, 'page_size')
+        target = sqlite3.connect(self.path)
+        try:
+            connection.backup(target, pages=self.pages, progress=self.on_copy_progress)
+        finally:
+            target.close()
+        self.processed = os.path.getsize(self.path)
+
+    def vacuum_into(self, connection: sqlite3.Connection) -> None:
+        """Writes compacted copy of database, where reclaimed bytes are the difference of sizes of database
+        and its copy"""
+
+        size = get_pragma(connection, 'page_count') * get_pragma(connection, 'page_size')
+        connection.set_progress_handler(self.on_file_progress, query_api.PROGRESS_STEPS)
+        connection.execute('VACUUM INTO ?', (self.path,))
+        self.processed = os.path.getsize(self.path)
+        self.reclaimed = max(size - self.processed, 0)
+
+    def incremental_vacuum(self, connection: sqlite3.Connection) -> None:
+        """Frees pages of freelist by steps of pages pages, so writers of other connections wait for one step
+        at most, and stops, when freelist is empty or it is not shrinking anymore"""
+
+        if get_pragma(connection, 'auto_vacuum') != 2:
+            raise sqlite3.OperationalError('database is not in auto_vacuum = INCREMENTAL mode')
+        page_size = get_pragma(connection, 'page_size')
+        first = freelist = get_pragma(connection, 'freelist_count')
+        while freelist:
+            if self.is_cancelled:
+                raise sqlite3.OperationalError('interrupted')
+            # execute() steps PRAGMA, that returns no columns, only once, which frees one page
+            connection.executescript(f'PRAGMA incremental_vacuum({self.pages});')
+            previous, freelist = freelist, get_pragma(connection, 'freelist_count')
+            self.processed = self.reclaimed = (first - freelist) * page_size
+            self.signals.progress.emit(self.processed // 1024)
+            if freelist >= previous:
+                break
+
+    def check(self, connection: sqlite3.Connection, pragma: str) -> None:
+        """Delivers up to CHECK_ERRORS errors of check, which are not delivered, if database is ok"""
+
+        connection.set_progress_handler(self.on_progress, query_api.PROGRESS_STEPS)
+        errors = [record[0] for record in connection.execute(f'PRAGMA {pragma}({CHECK_ERRORS})').fetchall()
+                  if record[0] != 'ok']
+        self.processed = get_pragma(connection, 'page_count') * get_pragma(connection, 'page_size')
+        self.signals.chunk.emit(errors)
+
+    def quick_check(self, connection: sqlite3.Connection) -> None:
+        self.check(connection, 'quick_check')
+
+    def integrity_check(self, connection: sqlite3.Connection) -> None:
+        self.check(connection, 'integrity_check')
@@ -0,0 +1,149 @@
+import contextlib
+import functools
+import json
+import threading
+import time
+from PyQt5 import QtCore
+
+import config_api
+
+BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+HEARTBEAT_INTERVAL = 50
+
+SECTIONS = ('statements', 'workers', 'gui', 'stalls')
+
+ENABLED = False
+
+LOCK = threading.Lock()
+
+METRICS = {section: {} for section in SECTIONS}
+
+HEARTBEAT = None
+
+LAST_BEAT = None
+
+
+class Histogram:
+    """Histogram of durations in ms by BUCKETS, which also keeps their number, total, maximum and number of rows"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+
+    def add(self, elapsed: float, rows: int = 0) -> None:
+        self.counts[next((i for i in range(len(BUCKETS)) if elapsed <= BUCKETS[i]), len(BUCKETS))] += 1
+        self.count += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        self.rows += rows
+
+    def get_percentile(self, percent: float) -> float:
+        """Returns upper bound of bucket, where percentile of durations falls, or maximum for the last bucket"""
+
+        rank = self.count * percent / 100
+        seen = 0
+        for i in range(len(BUCKETS)):
+            seen += self.counts[i]
+            if seen >= rank:
+                return round(min(BUCKETS[i], self.max), 3)
+        return round(self.max, 3)
+
+    def to_dict(self) -> dict:
+        return {'count': self.count, 'total_ms': round(self.total, 3), 'max_ms': round(self.max, 3),
+                'p50_ms': self.get_percentile(50), 'p95_ms': self.get_percentile(95), 'rows': self.rows,
+                'buckets': dict(zip([f'<={i}' for i in BUCKETS] + [f'>{BUCKETS[-1]}'], self.counts))}
+
+
+def load_metrics() -> None:
+    """Enables instrumentation, if the instrumentation parameter of config.ini is true"""
+
+    enable(bool(config_api.CONFIG['PERFORMANCE'].get('instrumentation', False)))
+
+
+def enable(enabled: bool) -> None:
+    """Turns recording of metrics and heartbeat timer, that measures stalls of event loop, on or off"""
+
+    global ENABLED, HEARTBEAT, LAST_BEAT
+    ENABLED = enabled
+    LAST_BEAT = None
+    if HEARTBEAT is None and enabled:
+        HEARTBEAT = QtCore.QTimer()
+        HEARTBEAT.timeout.connect(beat)
+    if HEARTBEAT is not None:
+        if enabled:
+            HEARTBEAT.start(HEARTBEAT_INTERVAL)
+        else:
+            HEARTBEAT.stop()
+
+
+def record(section: str, name: str, elapsed: float, rows: int = 0) -> None:
+    """Adds duration in ms and number of rows of operation to its histogram, if instrumentation is enabled
+
+    It can be called from any thread"""
+
+    if ENABLED:
+        with LOCK:
+            if name not in METRICS[section]:
+                METRICS[section][name] = Histogram()
+            METRICS[section][name].add(elapsed, rows)
+
+
+@contextlib.contextmanager
+def measure(name: str, section: str = 'gui'):
+    """Records duration of code inside with statement"""
+
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(section, name, (time.perf_counter() - start) * 1000)
+
+
+def timed(name: str, section: str = 'gui'):
+    """Returns decorator, that records duration of every call of function"""
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with measure(name, section):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def beat() -> None:
+    """Records delay of heartbeat timer, which is the time, while event loop could not process events"""
+
+    global LAST_BEAT
+    now = time.perf_counter()
+    if LAST_BEAT is not None:
+        record('stalls', 'event loop', max((now - LAST_BEAT) * 1000 - HEARTBEAT_INTERVAL, 0.0))
+    LAST_BEAT = now
+
+
+def get_metrics() -> dict:
+    """Returns copy of metrics as dicts of sections, where histograms are converted to dicts"""
+
+    with LOCK:
+        return {section: {name: histogram.to_dict() for name, histogram in METRICS[section].items()}
+                for section in SECTIONS}
+
+
+def reset() -> None:
+    with LOCK:
+        for section in SECTIONS:
+            METRICS[section].clear()
+
+
+def dump(path: str) -> None:
+    """Writes metrics to JSON file"""
+
+    with open(path, 'w') as file:
+        json.dump(get_metrics(), file, indent=2)
@@ -0,0 +1,197 @@
+import collections
+import json
+import math
+import random
+import sqlite3
+
+import blob_api
+import count_api
+import db_api
+import query_api
+import schema_api
+import style_api
+
+TableProfile = collections.namedtuple('TableProfile', ('table', 'state', 'rows', 'sampled', 'columns'))
+
+ColumnProfile = collections.namedtuple('ColumnProfile', ('name', 'affinity', 'nulls', 'distinct', 'min', 'max',
+                                                         'types', 'histogram'))
+
+SAMPLE_BLOCKS = 100
+
+HISTOGRAM_SIZE = 10
+
+LABEL_SIZE = 40
+
+TYPE_ORDER = {'integer': 0, 'real': 0, 'text': 1, 'blob': 2}
+
+
+def get_cache_path(db_path: str) -> str:
+    """Returns path of sidecar file, where profiles of tables of database are cached"""
+
+    return f'{db_path}-profile.json'
+
+
+def load_cache(db_path: str) -> dict:
+    try:
+        with open(get_cache_path(db_path)) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def get_cached_profile(db_path: str, table: str, state: tuple) -> TableProfile:
+    """Returns cached profile of table, if it was made in the same state of database, or None"""
+
+    cached = load_cache(db_path).get(table)
+    if cached is None or cached['state'] != json.loads(json.dumps(state)):
+        return None
+    return TableProfile(**dict(cached, columns=[ColumnProfile(**column) for column in cached['columns']]))
+
+
+def save_profile(db_path: str, profile: TableProfile) -> None:
+    """Writes profile to sidecar cache, replacing previous profile of its table"""
+
+    cache = load_cache(db_path)
+    cache[profile.table] = dict(profile._asdict(), columns=[column._asdict() for column in profile.columns])
+    with open(get_cache_path(db_path), 'w') as file:
+        json.dump(cache, file)
+
+
+def get_projection(column: str) -> str:
+    """Returns projection of quoted column, where BLOB values are cut to blob_api.PREVIEW_SIZE bytes"""
+
+    return f"CASE WHEN typeof({column}) = 'blob' THEN substr({column}, 1, {blob_api.PREVIEW_SIZE}) ELSE {column} END"
+
+
+def get_order(value) -> tuple:
+    """Returns key, which orders values of different storage classes like SQLite does it"""
+
+    return TYPE_ORDER[style_api.get_value_type(value)], value
+
+
+def estimate_distinct(counts: collections.Counter, sampled: int, rows: int) -> int:
+    """Returns number of distinct values of column by counts of values of sample, scaled by GEE estimator,
+    where values seen once in sample stand for sqrt(rows / sampled) values of table
+
+    If all values of sample are unique, column is considered unique, and their number is scaled to rows"""
+
+    if sampled >= rows:
+        return len(counts)
+    once = sum(1 for count in counts.values() if count == 1)
+    if once == sum(counts.values()):
+        return round(once * rows / sampled)
+    return round(math.sqrt(rows / sampled) * once + len(counts) - once)
+
+
+def get_histogram(counts: collections.Counter) -> list:
+    """Returns (label, count) of HISTOGRAM_SIZE equal-width bins of numeric values or, if there are
+    other values, of the most common values"""
+
+    numbers = [value for value in counts if isinstance(value, (int, float))]
+    if numbers and len(numbers) == len(counts):
+        low, high = min(numbers), max(numbers)
+        width = (high - low) / HISTOGRAM_SIZE or 1
+        bins = [0] * HISTOGRAM_SIZE
+        for value, count in counts.items():
+            bins[min(int((value - low) / width), HISTOGRAM_SIZE - 1)] += count
+        return [(f'{low + i * width:g} - {low + (i + 1) * width:g}', bins[i]) for i in range(HISTOGRAM_SIZE)
+                if bins[i]]
+    return [(blob_api.get_text(value)[:LABEL_SIZE], count) for value, count in counts.most_common(HISTOGRAM_SIZE)]
+
+
+def profile_column(name: str, declared: str, nulls: int, counts: collections.Counter, sampled: int,
+                   rows: int) -> ColumnProfile:
+    """Returns ColumnProfile of values of sample, which counts of NULL and distinct values are scaled to rows"""
+
+    types = collections.Counter({'null': nulls} if nulls else {})
+    for value, count in counts.items():
+        types[style_api.get_value_type(value)] += count
+    ordered = sorted(counts, key=get_order)
+    scale = rows / sampled if sampled else 0
+    return ColumnProfile(name, style_api.get_affinity(declared), round(nulls * scale),
+                         estimate_distinct(counts, sampled, rows),
+                         blob_api.get_text(ordered[0]) if ordered else None,
+                         blob_api.get_text(ordered[-1]) if ordered else None,
+                         dict(types.most_common()), get_histogram(counts))
+
+
+class ProfileWorker(query_api.QueryWorker):
+    """Profiles columns of table in background: counts NULL and distinct values, finds minimum and maximum,
+    storage classes of values in comparison with declared type and histogram of values
+
+    Tables, which have more than sample_size records, are profiled by SAMPLE_BLOCKS blocks of records from random
+    rowids, so huge table is never read entirely. Profile is cached in sidecar file and is reused, while database
+    has the same state, which is db_api.Database.get_state() with PRAGMA data_version. chunk(list) signal delivers
+    TableProfile, finished(int) reports number of profiled records"""
+
+    def __init__(self, db_path: str, table: str, state: tuple, sample_size: int, cached: bool = True):
+        super().__init__(db_path, '')
+        self.table = table
+        self.state = state
+        self.sample_size = sample_size
+        self.cached = cached
+        self.span = None
+
+    def run(self) -> None:
+        connection = db_api.connect(self.db_path)
+        connection.set_progress_handler(self.on_progress, query_api.PROGRESS_STEPS)
+        self.connection = connection
+        try:
+            profile = get_cached_profile(self.db_path, self.table, self.state) if self.cached else None
+            if profile is None:
+                profile = self.get_profile(connection)
+                try:
+                    save_profile(self.db_path, profile)
+                except OSError:
+                    pass
+            self.signals.chunk.emit([profile])
+            self.signals.finished.emit(profile.sampled)
+        except sqlite3.Error as e:
+            if self.is_cancelled:
+                self.signals.cancelled.emit()
+            else:
+                self.signals.failed.emit(str(e))
+        finally:
+            self.connection = None
+            connection.close()
+            self.signals.done.emit()
+
+    def get_profile(self, connection: sqlite3.Connection) -> TableProfile:
+        description = schema_api.Table(connection, self.table)
+        table = query_api.quote(self.table)
+        projection = ', '.join(get_projection(query_api.quote(column[1])) for column in description.columns)
+        nulls = [0] * len(description.columns)
+        counts = [collections.Counter() for _ in description.columns]
+        sampled = 0
+        for record in self.get_records(connection, table, projection, description.key == ('_rowid_',)):
+            sampled += 1
+            for i in range(len(record)):
+                if record[i] is None:
+                    nulls[i] += 1
+                else:
+                    counts[i][record[i]] += 1
+        rows = sampled
+        if self.span is not None or sampled >= self.sample_size:
+            rows = max(count_api.get_estimate(connection, self.table) or self.span or sampled, sampled)
+        return TableProfile(self.table, self.state, rows, sampled,
+                            [profile_column(column[1], column[2], nulls[i], counts[i], sampled, rows)
+                             for i, column in enumerate(description.columns)])
+
+    def get_records(self, connection: sqlite3.Connection, table: str, projection: str, rowid: bool):
+        """Yields all records of table or, if rowids of table span more than sample_size, blocks of records,
+        which start from random rowids"""
+
+        low, high = connection.execute(f'SELECT min(_rowid_), max(_rowid_) FROM {table}').fetchone() if rowid \
+            else (None, None)
+        if low is None or high - low < self.sample_size:
+            yield from connection.execute(f'SELECT {projection} FROM {table} LIMIT ?', (self.sample_size,))
+            return
+        self.span = high - low + 1
+        block = max(self.sample_size // SAMPLE_BLOCKS, 1)
+        last = None
+        for start in sorted(random.sample(range(low, high + 1), SAMPLE_BLOCKS)):
+            for record in connection.execute(
+                    f'SELECT _rowid_, {projection} FROM {table} WHERE _rowid_ >= ? ORDER BY _rowid_ LIMIT ?',
+                    (start if last is None else max(start, last + 1), block)):
+                last = record[0]
+                yield record[1:]
@@ -0,0 +1,312 @@
+import collections
+import sqlite3
+import threading
+import time
+from PyQt5 import QtCore
+
+import db_api
+import metrics_api
+
+POOL = QtCore.QThreadPool()
+
+WORKERS = set()
+
+CHUNK_SIZE = 256
+
+PROGRESS_STEPS = 10000
+
+FILTER_OPERATORS = ('>=', '<=', '!=', '=', '>', '<')
+
+LOGGED_STATEMENTS = ('SELECT', 'WITH', 'UPDATE', 'DELETE')
+
+PAGED_STATEMENTS = ('SELECT', 'WITH', 'VALUES')
+
+LOG = collections.OrderedDict()
+
+LOG_SIZE = 1000
+
+LOG_LOCK = threading.Lock()
+
+
+def quote(name: str) -> str:
+    """Returns SQLite identifier enclosed in double quotes"""
+
+    return '"' + name.replace('"', '""') + '"'
+
+
+def log_statement(db_path: str, key: str, sql: str, elapsed: float) -> None:
+    """Adds execution of statement with its time in ms to LOG, if its query plan can be analyzed
+
+    LOG keeps (count, total time, sql) by database and key, which is text of statement with parameters,
+    so executions with different values, e.g. keyset windows, are one entry. sql is the last executed text
+    with values, which can be explained. The least recently executed entries are dropped after LOG_SIZE"""
+
+    if sql.lstrip().upper().startswith(LOGGED_STATEMENTS):
+        with LOG_LOCK:
+            count, total, _ = LOG.pop((db_path, key), (0, 0.0, None))
+            LOG[db_path, key] = (count + 1, total + elapsed, sql)
+            if len(LOG) > LOG_SIZE:
+                LOG.popitem(last=False)
+
+
+def compile_filter(column: str, text: str) -> tuple:
+    """Returns parameterized SQL condition and its parameters, that filter quoted column by text
+
+    Text can be NULL or !NULL, comparison with value, which starts with =, !=, >, >=, < or <=,
+    or any other text, which is searched as substring by LIKE"""
+
+    text = text.strip()
+    if text.upper() == 'NULL':
+        return f'{column} IS NULL', ()
+    if text.upper() == '!NULL':
+        return f'{column} IS NOT NULL', ()
+    for operator in FILTER_OPERATORS:
+        if text.startswith(operator):
+            return f'{column} {operator} ?', (text[len(operator):].strip(),)
+    pattern = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"{column} LIKE ? ESCAPE '\\'", (f'%{pattern}%',)
+
+
+class QuerySignals(QtCore.QObject):
+    """Signals of QueryWorker, which are delivered to the GUI thread
+
+        described(list) - names of result columns, which is emitted before the first chunk
+        chunk(list) - next chunk of fetched records
+        progress(int) - number of fetched records or, while SQLite is still stepping, of progress handler calls
+        finished(int) - total number of fetched records after the statement has been committed
+        failed(str) - error message of sqlite3.Error
+        cancelled() - statement was interrupted by QueryWorker.cancel
+        done() - worker has finished in any way
+    """
+
+    described = QtCore.pyqtSignal(list)
+    chunk = QtCore.pyqtSignal(list)
+    progress = QtCore.pyqtSignal(int)
+    finished = QtCore.pyqtSignal(int)
+    failed = QtCore.pyqtSignal(str)
+    cancelled = QtCore.pyqtSignal()
+    done = QtCore.pyqtSignal()
+
+
+class QueryWorker(QtCore.QRunnable):
+    """Executes SQLite statement on QThreadPool through pooled connection of database and delivers records in chunks
+
+    Subclasses, which need their own connection, open it by db_api.connect()"""
+
+    def __init__(self, db_path: str, sql: str, params=(), many: bool = False, chunk_size: int = CHUNK_SIZE):
+        """db_path: str - path to SQLite database file
+        sql: str - SQL statement
+        params - statement parameters or, if many is True, iterable of them passed to executemany
+        chunk_size: int - number of records in one chunk signal"""
+
+        super().__init__()
+        self.db_path = db_path
+        self.sql = sql
+        self.params = params
+        self.many = many
+        self.chunk_size = chunk_size
+        self.signals = QuerySignals()
+        self.connection = None
+        self.lock = threading.Lock()
+        self.is_cancelled = False
+        self.steps = 0
+        self.traced = None
+
+    def run(self) -> None:
+        started = time.perf_counter()
+        connection = None
+        rows = 0
+        try:
+            connection = db_api.acquire(self.db_path)
+            connection.set_progress_handler(self.on_progress, PROGRESS_STEPS)
+            if not self.many:
+                connection.set_trace_callback(self.trace)
+            self.connection = connection
+            if self.is_cancelled:
+                raise sqlite3.OperationalError('interrupted')
+            if self.many:
+                cursor = connection.executemany(self.sql, self.params)
+            else:
+                cursor = connection.execute(self.sql, self.params)
+                self.signals.described.emit([column[0] for column in cursor.description or ()])
+            while True:
+                chunk = cursor.fetchmany(self.chunk_size)
+                if not chunk:
+                    break
+                rows += len(chunk)
+                self.signals.chunk.emit(chunk)
+                self.signals.progress.emit(rows)
+            connection.commit()
+            self.signals.finished.emit(rows)
+        except sqlite3.Error as e:
+            if self.is_cancelled:
+                self.signals.cancelled.emit()
+            else:
+                self.signals.failed.emit(str(e))
+        finally:
+            self.flush_trace()
+            self.detach()
+            if connection is not None:
+                db_api.release(self.db_path, connection)
+            metrics_api.record('statements', self.sql, (time.perf_counter() - started) * 1000, rows)
+            self.signals.done.emit()
+
+    def trace(self, sql: str) -> None:
+        """SQLite trace callback, which times every statement until the next one starts or worker ends
+
+        Statements of executemany are not traced, because callback is called for each of their parameters"""
+
+        now = time.perf_counter()
+        self.flush_trace(now)
+        self.traced = sql, now
+
+    def flush_trace(self, now: float = None) -> None:
+        if self.traced is not None:
+            sql, started = self.traced
+            self.traced = None
+            log_statement(self.db_path, self.sql, sql, ((now or time.perf_counter()) - started) * 1000)
+
+    def on_progress(self) -> int:
+        """SQLite progress handler, which reports progress and aborts statement, if worker is cancelled"""
+
+        self.steps += 1
+        self.signals.progress.emit(self.steps)
+        return self.is_cancelled
+
+    def cancel(self) -> None:
+        """Aborts running statement by Connection.interrupt() or prevents it from starting"""
+
+        self.is_cancelled = True
+        with self.lock:
+            connection = self.connection
+            if connection is not None:
+                try:
+                    connection.interrupt()
+                except sqlite3.ProgrammingError:
+                    pass  # worker has closed its connection between the check and the call
+
+    def detach(self) -> None:
+        """Forgets connection before it is returned to pool, so cancel() never interrupts its next user"""
+
+        with self.lock:
+            self.connection = None
+
+
+class PagedQueryWorker(QueryWorker):
+    """Executes SQLite statement through its own connection and delivers records by pages of chunk_size,
+    the first one at once and every next one on fetch_more() call
+
+    Nothing stays open between pages: next pages of query are selected again with LIMIT and OFFSET, results
+    of other statements are paged from memory. finished(int) reports number of fetched or modified records"""
+
+    def __init__(self, db_path: str, sql: str, params=(), chunk_size: int = CHUNK_SIZE):
+        super().__init__(db_path, sql, params, chunk_size=chunk_size)
+        self.requests = threading.Semaphore(0)
+
+    def run(self) -> None:
+        started = time.perf_counter()
+        connection = None
+        rows = 0
+        waited = 0.0
+        try:
+            connection = db_api.connect(self.db_path)
+            connection.set_progress_handler(self.on_progress, PROGRESS_STEPS)
+            connection.set_trace_callback(self.trace)
+            self.connection = connection
+            if self.is_cancelled:
+                raise sqlite3.OperationalError('interrupted')
+            cursor = connection.execute(self.sql, self.params)
+            if cursor.description is None:
+                connection.commit()
+                self.signals.finished.emit(cursor.rowcount)
+                return
+            self.signals.described.emit([column[0] for column in cursor.description])
+            records = None
+            if connection.in_transaction or not self.sql.lstrip().upper().startswith(PAGED_STATEMENTS):
+                records = cursor.fetchall()
+            page = cursor.fetchmany(self.chunk_size) if records is None else records[:self.chunk_size]
+            cursor.close()
+            connection.commit()
+            connection.set_trace_callback(None)
+            self.flush_trace()
+            while True:
+                rows += len(page)
+                if page:
+                    self.signals.chunk.emit(page)
+                if len(page) < self.chunk_size:
+                    break
+                POOL.releaseThread()  # lets other workers run, while this one waits for request
+                wait_started = time.perf_counter()
+                try:
+                    while not self.requests.acquire(timeout=0.1) and not self.is_cancelled:
+                        pass
+                finally:
+                    POOL.reserveThread()
+                    waited += time.perf_counter() - wait_started
+                if self.is_cancelled:
+                    raise sqlite3.OperationalError('interrupted')
+                if records is None:
+                    page = connection.execute(f'SELECT * FROM ({self.sql.rstrip().rstrip(";")}\n) '
+                                              f'LIMIT {self.chunk_size} OFFSET {rows}', self.params).fetchall()
+                else:
+                    page = records[rows:rows + self.chunk_size]
+            self.signals.finished.emit(rows)
+        except sqlite3.Error as e:
+            if self.is_cancelled:
+                self.signals.cancelled.emit()
+            else:
+                self.signals.failed.emit(str(e))
+        finally:
+            self.flush_trace()
+            self.detach()
+            if connection is not None:
+                connection.close()
+            metrics_api.record('statements', self.sql, (time.perf_counter() - started - waited) * 1000, rows)
+            self.signals.done.emit()
+
+    def fetch_more(self) -> None:
+        """Requests the next page of records"""
+
+        self.requests.release()
+
+
+def start(worker: QueryWorker) -> QueryWorker:
+    """Starts worker on POOL and keeps reference to it until it is done
+
+    Signals of worker are deleted by the event loop after done(), because otherwise they could be deleted
+    by garbage collector of another thread"""
+
+    started = time.perf_counter()
+    WORKERS.add(worker)
+    worker.signals.done.connect(lambda: WORKERS.discard(worker))
+    worker.signals.done.connect(lambda: metrics_api.record('workers', type(worker).__name__,
+                                                           (time.perf_counter() - started) * 1000))
+    worker.signals.done.connect(worker.signals.deleteLater)
+    POOL.start(worker)
+    return worker
+
+
+def get_workers(db_path: str) -> list:
+    """Returns started workers of database, which are not done yet"""
+
+    return [worker for worker in WORKERS if worker.db_path == db_path]
+
+
+def execute(db_path: str, sql: str, params=(), many: bool = False, on_finished=None, on_failed=None) -> QueryWorker:
+    """Starts QueryWorker for statement, which result is not needed, and connects its callbacks"""
+
+    worker = QueryWorker(db_path, sql, params, many)
+    if on_finished is not None:
+        worker.signals.finished.connect(on_finished)
+    if on_failed is not None:
+        worker.signals.failed.connect(on_failed)
+    return start(worker)
+
+
+def shutdown() -> None:
+    """Cancels all running workers and waits until POOL is done"""
+
+    for worker in list(WORKERS):
+        worker.cancel()
+    POOL.clear()
+    POOL.waitForDone()
@@ -0,0 +1,84 @@
+import sqlite3
+
+import query_api
+
+SHADOW_PREFIX = 'dbm_'
+
+SEARCH_PREFIX = f'{SHADOW_PREFIX}fts_'
+
+FTS5_SHADOWS = ('_data', '_idx', '_docsize', '_config', '_content')
+
+
+def get_internal_tables(tables: list) -> set:
+    """Returns names of internal tables among (name, sql) of sqlite_master: sqlite_ ones and FTS5 search indexes
+    of this app with their shadow tables, so user tables, which names start with dbm_, stay visible"""
+
+    indexes = {name for name, sql in tables
+               if name.startswith(SEARCH_PREFIX) and (sql or '').upper().startswith('CREATE VIRTUAL TABLE')}
+    return ({name for name, sql in tables if name.startswith('sqlite_')} | indexes |
+            {f'{index}{suffix}' for index in indexes for suffix in FTS5_SHADOWS})
+
+
+class Table:
+    """Cached description of SQLite table
+
+        name: str - table name
+        columns: list - result of PRAGMA table_info
+        indexes: list - (name, is unique, indexed columns) of every index
+        foreign_keys: list - result of PRAGMA foreign_key_list
+        key: tuple - quoted columns, by which records can be paginated in keyset manner, which are ('_rowid_',)
+    for rowid tables and primary key columns for WITHOUT ROWID tables
+    """
+
+    def __init__(self, connection: sqlite3.Connection, name: str):
+        table = query_api.quote(name)
+        self.name = name
+        self.columns = connection.execute(f'PRAGMA table_info({table})').fetchall()
+        self.indexes = [(index[1], bool(index[2]),
+                         [column[2] for column in connection.execute(
+                             f'PRAGMA index_info({query_api.quote(index[1])})').fetchall()])
+                        for index in connection.execute(f'PRAGMA index_list({table})').fetchall()]
+        self.foreign_keys = connection.execute(f'PRAGMA foreign_key_list({table})').fetchall()
+        try:
+            connection.execute(f'SELECT _rowid_ FROM {table} LIMIT 0')
+            self.key = '_rowid_',
+        except sqlite3.OperationalError:
+            self.key = tuple(query_api.quote(column[1]) for column in sorted(self.columns, key=lambda i: i[5])
+                             if column[5])
+
+
+class Schema:
+    """Cache of tables of database with their columns, types, indexes and foreign keys
+
+    Cache is dropped only when PRAGMA schema_version of database changes, so reading it costs no catalog queries.
+    Tables are described on the first request"""
+
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+        self.version = None
+        self.names = []
+        self.tables = {}
+
+    def validate(self) -> None:
+        """Drops cache, if schema has been changed since it was read"""
+
+        version = self.connection.execute('PRAGMA schema_version').fetchone()[0]
+        if version != self.version:
+            self.version = version
+            tables = self.connection.execute("SELECT name, sql FROM sqlite_master WHERE type='table' ORDER BY rowid"
+                                             ).fetchall()
+            internal = get_internal_tables(tables)
+            self.names = [name for name, sql in tables if name not in internal]
+            self.tables = {}
+
+    def get_tables(self) -> list:
+        """Returns names of user tables, excluding internal sqlite_ ones and search indexes of this app"""
+
+        self.validate()
+        return self.names
+
+    def get_table(self, name: str) -> Table:
+        self.validate()
+        if name not in self.tables:
+            self.tables[name] = Table(self.connection, name)
+        return self.tables[name]
@@ -0,0 +1,135 @@
+import sqlite3
+
+import db_api
+import query_api
+import schema_api
+import style_api
+
+PREFIX = schema_api.SEARCH_PREFIX
+
+
+def get_index_name(table: str) -> str:
+    return f'{PREFIX}{table}'
+
+
+def get_text_columns(columns: list) -> list:
+    """Returns names of columns, which have TEXT affinity"""
+
+    return [column[1] for column in columns if style_api.get_affinity(column[2]) == 'text']
+
+
+def has_indexes(connection: sqlite3.Connection) -> bool:
+    """Returns whether database has any FTS5 index of search"""
+
+    return connection.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND sql LIKE 'CREATE VIRTUAL TABLE%' "
+                              "AND substr(name, 1, ?) = ? LIMIT 1", (len(PREFIX), PREFIX)).fetchone() is not None
+
+
+def create_index(connection: sqlite3.Connection, table: str, columns: list) -> None:
+    """Creates FTS5 index over columns of rowid table, which reads content from the table itself,
+    and triggers, that keep it current on every INSERT, UPDATE and DELETE"""
+
+    index = query_api.quote(get_index_name(table))
+    source = query_api.quote(table)
+    names = ', '.join(map(query_api.quote, columns))
+    new = ', '.join(f'new.{query_api.quote(column)}' for column in columns)
+    old = ', '.join(f'old.{query_api.quote(column)}' for column in columns)
+    delete = f"INSERT INTO {index}({index}, rowid, {names}) VALUES ('delete', old.rowid, {old});"
+    insert = f'INSERT INTO {index}(rowid, {names}) VALUES (new.rowid, {new});'
+    connection.executescript(f'''
+        BEGIN;
+        CREATE VIRTUAL TABLE {index} USING fts5({names}, content={source}, content_rowid='rowid');
+        CREATE TRIGGER {query_api.quote(get_index_name(table) + '_ai')} AFTER INSERT ON {source} BEGIN {insert} END;
+        CREATE TRIGGER {query_api.quote(get_index_name(table) + '_ad')} AFTER DELETE ON {source} BEGIN {delete} END;
+        CREATE TRIGGER {query_api.quote(get_index_name(table) + '_au')} AFTER UPDATE ON {source}
+            BEGIN {delete} {insert} END;
+        INSERT INTO {index}({index}) VALUES ('rebuild');
+        COMMIT;
+    ''')
+
+
+def drop_index(connection: sqlite3.Connection, table: str) -> None:
+    """Drops FTS5 index of table together with its triggers"""
+
+    connection.executescript(f'''
+        BEGIN;
+        DROP TRIGGER IF EXISTS {query_api.quote(get_index_name(table) + '_ai')};
+        DROP TRIGGER IF EXISTS {query_api.quote(get_index_name(table) + '_ad')};
+        DROP TRIGGER IF EXISTS {query_api.quote(get_index_name(table) + '_au')};
+        DROP TABLE IF EXISTS {query_api.quote(get_index_name(table))};
+        COMMIT;
+    ''')
+
+
+def get_match_query(text: str) -> str:
+    """Returns FTS5 query, that matches every word of text, where the last one may be a prefix"""
+
+    words = ['"' + word.replace('"', '""') + '"' for word in text.split()]
+    if words:
+        words[-1] += '*'
+    return ' '.join(words)
+
+
+class SearchWorker(query_api.QueryWorker):
+    """Searches text in all tables of database through FTS5 side indexes
+
+    Indexes, which are missing or stale because of changed TEXT columns, are (re)built before the search,
+    progress(int) signal reports number of checked tables. chunk(list) signal delivers hits, which are
+    (table, rowid, column) sorted by bm25 rank, finished(int) reports their number"""
+
+    def __init__(self, db_path: str, text: str, limit: int = 100):
+        super().__init__(db_path, get_match_query(text))
+        self.limit = limit
+
+    def run(self) -> None:
+        connection = db_api.connect(self.db_path, isolation_level=None)
+        # side indexes are written even to read-only snapshot, which is a private copy of database
+        connection.execute('PRAGMA query_only = OFF')
+        self.connection = connection
+        try:
+            schema = schema_api.Schema(connection)
+            indexed = {i[0][len(PREFIX):] for i in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' AND sql LIKE 'CREATE VIRTUAL TABLE%' "
+                "AND substr(name, 1, ?) = ?", (len(PREFIX), PREFIX)).fetchall()}
+            tables = schema.get_tables()
+            for table in indexed - set(tables):
+                drop_index(connection, table)
+            hits = []
+            for i in range(len(tables)):
+                if self.is_cancelled:
+                    raise sqlite3.OperationalError('interrupted')
+                description = schema.get_table(tables[i])
+                columns = get_text_columns(description.columns)
+                if description.key != ('_rowid_',) or not columns:
+                    continue
+                index = get_index_name(tables[i])
+                if tables[i] in indexed and [column[1] for column in connection.execute(
+                        f'PRAGMA table_info({query_api.quote(index)})').fetchall()] != columns:
+                    drop_index(connection, tables[i])
+                    indexed.discard(tables[i])
+                if tables[i] not in indexed:
+                    create_index(connection, tables[i], columns)
+                highlights = ', '.join(f"highlight({query_api.quote(index)}, {j}, char(1), char(2))"
+                                       for j in range(len(columns)))
+                for record in connection.execute(
+                        f'SELECT rowid, rank, {highlights} FROM {query_api.quote(index)} '
+                        f'WHERE {query_api.quote(index)} MATCH ? ORDER BY rank LIMIT ?',
+                        (self.sql, self.limit)).fetchall():
+                    column = next((columns[j] for j in range(len(columns)) if '\x01' in (record[j + 2] or '')),
+                                  columns[0])
+                    hits.append((record[1], tables[i], record[0], column))
+                self.signals.progress.emit(i + 1)
+            hits = [hit[1:] for hit in sorted(hits)[:self.limit]]
+            self.signals.chunk.emit(hits)
+            self.signals.finished.emit(len(hits))
+        except sqlite3.Error as e:
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            if self.is_cancelled:
+                self.signals.cancelled.emit()
+            else:
+                self.signals.failed.emit(str(e))
+        finally:
+            self.connection = None
+            connection.close()
+            self.signals.done.emit()
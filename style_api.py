@@ -0,0 +1,97 @@
+import collections
+import functools
+import re
+from PyQt5 import QtCore, QtGui
+
+import config_api
+
+TypeStyle = collections.namedtuple('TypeStyle', ('color', 'alignment', 'font', 'icon'))
+
+EditStyle = collections.namedtuple('EditStyle', ('background', 'font'))
+
+QSS_PROPERTY = re.compile(r'([\w-]+)\s*:\s*([^;]+);')
+
+
+def get_theme() -> str:
+    """Returns name of the theme, which stylesheet is selected by the style parameter from the config.ini file"""
+
+    return config_api.CONFIG['APPEARANCE']['style'].split('/')[0]
+
+
+def get_affinity(sql_type: str) -> str:
+    """Returns lowercase name of SQLite type affinity of declared column type, which is also name of its type style
+
+    Affinity is determined by the rules of SQLite, except that NUMERIC affinity is styled as real"""
+
+    sql_type = sql_type.upper()
+    if 'INT' in sql_type:
+        return 'integer'
+    if any(i in sql_type for i in ('CHAR', 'CLOB', 'TEXT')):
+        return 'text'
+    if 'BLOB' in sql_type or not sql_type:
+        return 'blob'
+    return 'real'
+
+
+def get_value_type(value) -> str:
+    """Returns name of type style of SQLite value by its storage class"""
+
+    if value is None:
+        return 'null'
+    if isinstance(value, bytes):
+        return 'blob'
+    if isinstance(value, str):
+        return 'text'
+    return 'integer' if isinstance(value, int) else 'real'
+
+
+@functools.lru_cache(maxsize=None)
+def get_icon(path: str) -> QtGui.QIcon:
+    """Returns QIcon, which is shared by all widgets and reads its file only when it is painted for the first time"""
+
+    return QtGui.QIcon(path)
+
+
+@functools.lru_cache(maxsize=None)
+def get_type_stylesheet(theme: str, type_: str) -> str:
+    """Returns content of stylesheet/__theme__/type/__type__.qss, which is read once per theme"""
+
+    with open(f'stylesheet/{theme}/type/{type_}.qss') as qss:
+        return qss.read()
+
+
+@functools.lru_cache(maxsize=None)
+def get_type_style(theme: str, type_: str) -> TypeStyle:
+    """Returns TypeStyle compiled from type stylesheet and icon from res/ico/type once per theme
+
+    Supported properties are color, font-weight, font-style and position, where position: right
+    aligns values to the right"""
+
+    properties = dict(QSS_PROPERTY.findall(get_type_stylesheet(theme, type_)))
+    color = QtGui.QColor(properties.get('color', '').strip())
+    alignment = QtCore.Qt.AlignVCenter | (QtCore.Qt.AlignRight if properties.get('position', '').strip() == 'right'
+                                          else QtCore.Qt.AlignLeft)
+    font = None
+    if 'font-weight' in properties or 'font-style' in properties:
+        font = QtGui.QFont()
+        font.setBold(properties.get('font-weight', '').strip() == 'bold')
+        font.setItalic(properties.get('font-style', '').strip() == 'italic')
+    icon = QtGui.QIcon(QtGui.QPixmap(f'res/ico/type/{type_}.png'))
+    return TypeStyle(color if color.isValid() else None, alignment, font, icon)
+
+
+@functools.lru_cache(maxsize=None)
+def get_edit_style(theme: str, state: str) -> EditStyle:
+    """Returns EditStyle of cells, which are changed or deleted in edit session, compiled from
+    stylesheet/__theme__/edit/__state__.qss once per theme
+
+    Supported properties are background and text-decoration: line-through"""
+
+    with open(f'stylesheet/{theme}/edit/{state}.qss') as qss:
+        properties = dict(QSS_PROPERTY.findall(qss.read()))
+    background = QtGui.QColor(properties.get('background', '').strip())
+    font = None
+    if properties.get('text-decoration', '').strip() == 'line-through':
+        font = QtGui.QFont()
+        font.setStrikeOut(True)
+    return EditStyle(QtGui.QBrush(background) if background.isValid() else None, font)
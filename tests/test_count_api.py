@@ -0,0 +1,28 @@
+import sqlite3
+
+import count_api
+
+
+def create_database() -> sqlite3.Connection:
+    connection = sqlite3.connect(':memory:')
+    connection.execute('CREATE TABLE r (a)')
+    connection.executemany('INSERT INTO r (rowid, a) VALUES (?, 0)', ((i,) for i in range(1, 101)))
+    connection.execute('DELETE FROM r WHERE rowid % 10 = 0')
+    connection.execute('CREATE TABLE w (a PRIMARY KEY) WITHOUT ROWID')
+    connection.executemany('INSERT INTO w VALUES (?)', ((i,) for i in range(30)))
+    connection.execute('CREATE TABLE e (a)')
+    return connection
+
+
+def test_estimate_rows_of_rowid_table_is_span_of_rowids():
+    connection = create_database()
+    assert count_api.estimate_rows(connection, 'r') == 99
+    assert count_api.estimate_rows(connection, 'e') == 0
+
+
+def test_estimate_rows_of_without_rowid_table_needs_statistics():
+    connection = create_database()
+    assert count_api.estimate_rows(connection, 'w') is None
+    connection.execute('ANALYZE')
+    assert count_api.estimate_rows(connection, 'w') == 30
+    assert count_api.estimate_rows(connection, 'r') == 90
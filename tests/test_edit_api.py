@@ -0,0 +1,41 @@
+import sqlite3
+
+import edit_api
+
+
+def test_update_of_non_contiguous_keys_fits_parameter_limit():
+    connection = sqlite3.connect(':memory:')
+    connection.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, edit_api.MAX_PARAMETERS)
+    connection.execute('CREATE TABLE t (a, b)')
+    connection.executemany('INSERT INTO t (rowid, a, b) VALUES (?, 0, 0)', ((i,) for i in range(1, 4001)))
+    keys = [(i,) for i in range(1, 4001, 2)]
+    step = edit_api.Step('update', 't', ('_rowid_',), keys, {'a': 1, 'b': 2})
+    statements = edit_api.get_statements(step)
+    assert len(statements) > 1
+    for sql, params in statements:
+        assert len(params) <= edit_api.MAX_PARAMETERS
+        connection.execute(sql, params)
+    assert connection.execute('SELECT count(*) FROM t WHERE a = 1 AND b = 2').fetchone()[0] == len(keys)
+
+
+def test_get_spans_merges_contiguous_rowids():
+    assert edit_api.get_spans([(5,), (1,), (2,), (3,), (7,), (6,), (3,)]) == [[1, 3], [5, 7]]
+
+
+def test_get_key_conditions_uses_between_for_long_spans():
+    conditions = edit_api.get_key_conditions(('_rowid_',), [(1,), (2,), (3,), (10,), (12,), (13,)])
+    assert conditions == [('_rowid_ BETWEEN ? AND ? OR _rowid_ IN (?, ?, ?)', (1, 3, 10, 12, 13))]
+
+
+def test_get_key_conditions_splits_row_values_by_parameter_limit():
+    key = ('"a"', '"b"')
+    keys = [(i, str(i)) for i in range(1000)]
+    conditions = edit_api.get_key_conditions(key, keys, reserved=10)
+    assert all(len(params) <= edit_api.MAX_PARAMETERS - 10 for condition, params in conditions)
+    assert sum(len(params) for condition, params in conditions) == 2 * len(keys)
+    connection = sqlite3.connect(':memory:')
+    connection.execute('CREATE TABLE t (a, b, PRIMARY KEY (a, b)) WITHOUT ROWID')
+    connection.executemany('INSERT INTO t VALUES (?, ?)', keys + [(i, 'other') for i in range(10)])
+    selected = sum(connection.execute(f'SELECT count(*) FROM t WHERE {condition}', params).fetchone()[0]
+                   for condition, params in conditions)
+    assert selected == len(keys)
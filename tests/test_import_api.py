@@ -0,0 +1,34 @@
+import pytest
+
+import import_api
+
+COLUMNS = [(0, 'id', 'INTEGER', 0, None, 1), (1, 'Name', 'TEXT', 0, None, 0), (2, 'score', 'REAL', 0, None, 0)]
+
+
+def read(tmp_path, name: str, text: str, header: bool = True) -> tuple:
+    path = tmp_path / name
+    path.write_text(text, encoding='utf8')
+    names, records = import_api.read_records(str(path), COLUMNS, header)
+    return names, [tuple(record) for record in records]
+
+
+def test_read_records_maps_header_case_insensitively(tmp_path):
+    assert read(tmp_path, 'a.csv', 'score,NAME,other\n1.5,x,?\n,,\n') == (
+        ['score', 'Name'], [('1.5', 'x'), (None, '')])
+
+
+def test_read_records_without_header_maps_by_position(tmp_path):
+    assert read(tmp_path, 'a.tsv', '1\tx\n2\t"y\tz"\n', header=False) == (
+        ['id', 'Name'], [('1', 'x'), ('2', 'y\tz')])
+
+
+def test_read_records_rejects_header_without_columns(tmp_path):
+    with pytest.raises(ValueError):
+        read(tmp_path, 'a.csv', '1,x\n')
+
+
+def test_read_records_of_json_lines(tmp_path):
+    assert read(tmp_path, 'a.jsonl', '{"id": 1, "name": "x", "other": 0}\n\n{"name": "y"}\n') == (
+        ['id', 'Name'], [(1, 'x'), (None, 'y')])
+    with pytest.raises(ValueError):
+        read(tmp_path, 'b.jsonl', '[1, 2]\n')
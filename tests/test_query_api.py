@@ -0,0 +1,30 @@
+import sqlite3
+
+import query_api
+
+
+def select(text: str) -> list:
+    connection = sqlite3.connect(':memory:')
+    connection.execute('CREATE TABLE t (c NUMERIC)')
+    connection.executemany('INSERT INTO t VALUES (?)', [(None,), (5,), (10,), ('a%b',), ('a_b',), ('axb',), ('a\\b',)])
+    condition, params = query_api.compile_filter('"c"', text)
+    return [record[0] for record in connection.execute(f'SELECT c FROM t WHERE {condition} ORDER BY rowid', params)]
+
+
+def test_compile_filter_null():
+    assert select('null') == [None]
+    assert select(' !NULL ') == [5, 10, 'a%b', 'a_b', 'axb', 'a\\b']
+
+
+def test_compile_filter_comparison_is_parameterized():
+    assert query_api.compile_filter('"c"', '>= 7') == ('"c" >= ?', ('7',))
+    assert select('<7') == [5]
+    assert select('=10') == [10]
+    assert select('!=5') == [10, 'a%b', 'a_b', 'axb', 'a\\b']
+
+
+def test_compile_filter_escapes_like_wildcards():
+    assert select('%') == ['a%b']
+    assert select('_') == ['a_b']
+    assert select('\\') == ['a\\b']
+    assert select("'; DROP TABLE t; --") == []